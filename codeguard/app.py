@@ -33,9 +33,7 @@ import logging
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
-from src.detectors.token_detector import TokenDetector
-from src.detectors.ast_detector import ASTDetector
-from src.detectors.hash_detector import HashDetector
+from src.detectors.pairwise import score_pairs
 from src.voting.voting_system import VotingSystem
 from src.voting.confidence_calculator import get_confidence_level
 from src.database.connection import init_db
@@ -249,11 +247,12 @@ def analyze_files(files, threshold: float, config: Optional[Dict[str, Any]] = No
     Analyze all file pairs using all three detectors (Token, AST, Hash) with VotingSystem.
 
     This function:
-    1. Creates instances of TokenDetector, ASTDetector, HashDetector, and VotingSystem
+    1. Reads every file once and creates a VotingSystem
     2. Generates all possible file pairs (N*(N-1)/2 combinations)
-    3. Analyzes each pair using all three detection methods (conditionally executes hash)
+    3. Analyzes each pair using all three detection methods (conditionally executes hash),
+       spreading the pairs over worker processes (see score_pairs)
     4. Uses VotingSystem to make final plagiarism determination
-    5. Displays progress in real-time with detector-specific status
+    5. Displays progress in real-time as each pair's scores arrive
     6. Returns results as a formatted DataFrame with voting metrics
 
     Args:
@@ -302,18 +301,11 @@ def analyze_files(files, threshold: float, config: Optional[Dict[str, Any]] = No
     hash_active = config['hash']['weight'] > 0.0
     logger.info(f"Hash detector status: {'ACTIVE' if hash_active else 'DISABLED (weight=0.0)'}")
 
-    # Create detector instances with thresholds from config
-    token_detector = TokenDetector(threshold=config['token']['threshold'])
-    ast_detector = ASTDetector(threshold=config['ast']['threshold'])
-
-    # Only create hash detector if it will be used
+    # Detectors run in worker processes (see score_pairs); thresholds are
+    # applied here, so the workers only need the hash winnowing parameters
     if hash_active:
-        hash_detector = HashDetector(
-            threshold=config['hash']['threshold'], k=HASH_K_GRAM, w=HASH_WINDOW
-        )
         logger.info(f"Hash detector initialized with threshold={config['hash']['threshold']:.2f}, k={HASH_K_GRAM}, w={HASH_WINDOW}")
     else:
-        hash_detector = None
         logger.info("Hash detector initialization SKIPPED (disabled in config)")
 
     # Create VotingSystem instance with configuration
@@ -321,91 +313,77 @@ def analyze_files(files, threshold: float, config: Optional[Dict[str, Any]] = No
 
     results = []
 
+    # Read every file once; the pairs below refer to files by index
+    sources = []
+    for file in files:
+        sources.append(file.read().decode("utf-8"))
+        # Reset file pointer for potential re-reading
+        file.seek(0)
+
     # Generate all file pairs (combinations, not permutations)
     # For N files, this creates N*(N-1)/2 pairs
-    pairs = [(files[i], files[j]) for i in range(len(files)) for j in range(i + 1, len(files))]
+    pairs = [(i, j) for i in range(len(files)) for j in range(i + 1, len(files))]
 
     # Progress tracking
     progress_bar = st.progress(0)
     status_text = st.empty()
     total_pairs = len(pairs)
+    status_text.text(f"Running detectors on {total_pairs} pairs...")
+
+    # Loop-invariant configuration, looked up once instead of per pair
+    token_threshold = config['token']['threshold']
+    ast_threshold = config['ast']['threshold']
+    hash_threshold = config['hash']['threshold']
+
+    # Score the pairs on all cores; results arrive in pair order.
+    # Performance note: Skipping hash detector on simple problems saves ~30-40% execution time
+    # Hash detector uses Winnowing algorithm which is expensive on small files
+    # In Simple preset (files <50 lines), hash is ineffective anyway (0% precision)
+    pair_scores = score_pairs(
+        sources, pairs, hash_active=hash_active, hash_k=HASH_K_GRAM, hash_w=HASH_WINDOW
+    )
 
-    # Analyze each pair with all three detectors
-    for idx, (file1, file2) in enumerate(pairs):
-        # Read file contents once for all detectors
-        code1 = file1.read().decode("utf-8")
-        code2 = file2.read().decode("utf-8")
-
-        # Reset file pointers for potential re-reading
-        file1.seek(0)
-        file2.seek(0)
-
-        # Calculate base progress for this pair
-        base_progress = idx / total_pairs
+    for idx, ((i, j), scores) in enumerate(zip(pairs, pair_scores)):
+        file1, file2 = files[i], files[j]
+        errors = scores["errors"]
 
         # ===== TOKEN DETECTOR =====
-        status_text.text(
-            f"Token Detector: Pair {idx + 1}/{total_pairs} - {file1.name} vs {file2.name}"
-        )
-        progress_bar.progress(base_progress + (0.33 / total_pairs))
-
-        try:
-            # Get token detector results
-            tokens1 = token_detector._tokenize_code(code1)
-            tokens2 = token_detector._tokenize_code(code2)
-
-            jaccard_sim = token_detector._calculate_jaccard_similarity(tokens1, tokens2)
-            cosine_sim = token_detector._calculate_cosine_similarity(tokens1, tokens2)
-            token_sim = (jaccard_sim + cosine_sim) / 2.0
-
-            token_verdict = "🚨 FLAGGED" if token_sim >= config['token']['threshold'] else "✅ CLEAR"
-            logger.debug(f"Token detector: {file1.name} vs {file2.name}, score={token_sim:.3f}")
-        except Exception as e:
-            st.warning(f"Token Detector error on {file1.name} vs {file2.name}: {str(e)[:50]}")
-            jaccard_sim, cosine_sim, token_sim = 0.0, 0.0, 0.0
+        jaccard_sim = scores["token_jaccard"]
+        cosine_sim = scores["token_cosine"]
+        token_sim = (jaccard_sim + cosine_sim) / 2.0
+        if "token" in errors:
+            st.warning(f"Token Detector error on {file1.name} vs {file2.name}: {errors['token'][:50]}")
             token_verdict = "⚠️ ERROR"
-            logger.error(f"Token detector error: {str(e)}")
+            logger.error(f"Token detector error: {errors['token']}")
+        else:
+            token_verdict = "🚨 FLAGGED" if token_sim >= token_threshold else "✅ CLEAR"
+            logger.debug(f"Token detector: {file1.name} vs {file2.name}, score={token_sim:.3f}")
 
         # ===== AST DETECTOR =====
-        status_text.text(f"AST Detector: Pair {idx + 1}/{total_pairs} - {file1.name} vs {file2.name}")
-        progress_bar.progress(base_progress + (0.66 / total_pairs))
-
-        try:
-            ast_sim = ast_detector.compare(code1, code2)
-            ast_verdict = "🚨 FLAGGED" if ast_sim >= config['ast']['threshold'] else "✅ CLEAR"
-            logger.debug(f"AST detector: {file1.name} vs {file2.name}, score={ast_sim:.3f}")
-        except Exception as e:
-            st.warning(f"AST Detector error on {file1.name} vs {file2.name}: {str(e)[:50]}")
-            ast_sim = 0.0
+        ast_sim = scores["ast"]
+        if "ast" in errors:
+            st.warning(f"AST Detector error on {file1.name} vs {file2.name}: {errors['ast'][:50]}")
             ast_verdict = "⚠️ ERROR"
-            logger.error(f"AST detector error: {str(e)}")
+            logger.error(f"AST detector error: {errors['ast']}")
+        else:
+            ast_verdict = "🚨 FLAGGED" if ast_sim >= ast_threshold else "✅ CLEAR"
+            logger.debug(f"AST detector: {file1.name} vs {file2.name}, score={ast_sim:.3f}")
 
         # ===== HASH DETECTOR (CONDITIONAL) =====
-        # Performance note: Skipping hash detector on simple problems saves ~30-40% execution time
-        # Hash detector uses Winnowing algorithm which is expensive on small files
-        # In Simple preset (files <50 lines), hash is ineffective anyway (0% precision)
-        if hash_active:
-            status_text.text(
-                f"Hash Detector: Pair {idx + 1}/{total_pairs} - {file1.name} vs {file2.name}"
-            )
-            progress_bar.progress(base_progress + (1.0 / total_pairs))
-
-            try:
-                hash_sim = hash_detector.compare(code1, code2)
-                hash_verdict = "🚨 FLAGGED" if hash_sim >= config['hash']['threshold'] else "✅ CLEAR"
-                logger.debug(f"Hash detector executed: {file1.name} vs {file2.name}, score={hash_sim:.3f}")
-            except Exception as e:
-                st.warning(f"Hash Detector error on {file1.name} vs {file2.name}: {str(e)[:50]}")
-                hash_sim = 0.0
-                hash_verdict = "⚠️ ERROR"
-                logger.error(f"Hash detector error: {str(e)}")
-        else:
+        hash_sim = scores["hash"]
+        if not hash_active:
             # Hash detector SKIPPED - weight is 0.0
-            hash_sim = 0.0
             hash_verdict = "⏭️ SKIPPED"
             logger.debug(f"Hash detector SKIPPED (disabled): {file1.name} vs {file2.name}")
-            # Update progress to show completion
-            progress_bar.progress(base_progress + (1.0 / total_pairs))
+        elif "hash" in errors:
+            st.warning(f"Hash Detector error on {file1.name} vs {file2.name}: {errors['hash'][:50]}")
+            hash_verdict = "⚠️ ERROR"
+            logger.error(f"Hash detector error: {errors['hash']}")
+        else:
+            hash_verdict = "🚨 FLAGGED" if hash_sim >= hash_threshold else "✅ CLEAR"
+            logger.debug(f"Hash detector executed: {file1.name} vs {file2.name}, score={hash_sim:.3f}")
+
+        progress_bar.progress((idx + 1) / total_pairs)
 
         # ===== VOTING SYSTEM =====
         status_text.text(
@@ -420,7 +398,7 @@ def analyze_files(files, threshold: float, config: Optional[Dict[str, Any]] = No
             logger.info(f"\nPair {idx + 1}: {file1.name} vs {file2.name}")
             logger.info(f"  Token: {token_sim:.3f} {'✓' if voting_result['votes']['token'] > 0 else '✗'}")
             logger.info(f"  AST: {ast_sim:.3f} {'✓' if voting_result['votes']['ast'] > 0 else '✗'}")
-            logger.info(f"  Hash: {hash_sim:.3f} {'✓' if voting_result['votes']['hash'] > 0 else '⏭ SKIPPED' if config['hash']['weight'] == 0 else '✗'}")
+            logger.info(f"  Hash: {hash_sim:.3f} {'✓' if voting_result['votes']['hash'] > 0 else '⏭ SKIPPED' if not hash_active else '✗'}")
             logger.info(f"  Result: {'PLAGIARIZED' if voting_result['is_plagiarized'] else 'CLEAR'}")
 
             # Extract voting information
@@ -33,27 +33,183 @@ Date: 2025-12-03
 
 import sys
 import os
+import argparse
 from pathlib import Path
 import time
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from itertools import combinations
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set, TYPE_CHECKING
 import csv
+import hashlib
 import json
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
+from functools import lru_cache
+from operator import attrgetter
+
+try:
+    # Optional: orjson (de)serializes the score cache several times faster
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.core.config_presets import get_preset_config
-from src.detectors.token_detector import TokenDetector
-from src.detectors.ast_detector import ASTDetector
-from src.detectors.hash_detector import HashDetector
-from src.voting.voting_system import VotingSystem
+# Detector scores persisted between runs (see ModeComparator.save_score_cache)
+SCORE_CACHE_PATH = Path(__file__).parent.parent / '.cache' / 'mode_comparison_scores.json'
+# Sources that determine the cached scores: the detectors and this script,
+# which reads the files and calls the detectors
+DETECTOR_SOURCES = [
+    Path(__file__).parent.parent / 'src' / 'detectors' / name
+    for name in ('token_detector.py', 'ast_detector.py', 'hash_detector.py')
+] + [Path(__file__)]
 
+# Detector and voting modules are imported where they are first used, so
+# the script can report missing test data without paying their import cost
+if TYPE_CHECKING:
+    from src.voting.voting_system import VotingSystem
 
-@dataclass
+
+# Report templates (parsed once at import, filled with str.format_map)
+DETAILED_RESULTS_ROW = (
+    "| {problem} | {mode} | {tp} | {fp} | {tn} | {fn} | "
+    "{precision:.2%} | {recall:.2%} | {f1:.4f} | {accuracy:.2%} |"
+)
+
+REPORT_CONCLUSIONS_TEMPLATE = """\
+## Mode Recommendations
+
+| Assignment Type | File Size | Recommended Mode | Rationale |
+|-----------------|-----------|------------------|-----------|
+| Simple algorithms (FizzBuzz, palindrome) | < 50 lines | SIMPLE | Hash detector disabled reduces false positives on constrained problems |
+| Medium assignments (games, utilities) | 50-150 lines | STANDARD | All three detectors provide balanced coverage |
+| Complex projects (web apps, algorithms) | > 150 lines | STANDARD | Hash detector excels at detecting partial/scattered copying |
+
+## Conclusions and Recommendations
+
+### When to Use SIMPLE Mode
+
+- Constrained problems with limited solution space (<50 lines)
+- Assignments where structural similarity is more important than token-level matching
+- When higher precision is required (fewer false alarms)
+- Examples: FizzBuzz, Fibonacci, palindrome checkers
+
+### When to Use STANDARD Mode
+
+- Realistic assignments with sufficient code volume (50+ lines)
+- Projects where partial/scattered copying is a concern
+- When higher recall is required (catch more plagiarism)
+- Examples: web applications, data processors, games, complex algorithms
+
+### Key Insights
+
+1. **Hash Detector Impact:** Disabling the hash detector in SIMPLE mode significantly reduces false positives on small files
+2. **AST Detector Reliability:** Both modes rely heavily on AST detection, which proves most reliable across all file sizes
+3. **Threshold Tuning:** SIMPLE mode's stricter AST threshold (0.85 vs 0.80) helps distinguish plagiarism from natural similarity
+4. **Trade-offs:** SIMPLE mode favors precision, STANDARD mode balances precision and recall
+
+### Statistical Significance
+
+- Total comparisons: {total_comparisons}
+- Problems tested: {problems_tested}
+- Modes compared: 2 (SIMPLE, STANDARD)
+- Ground truth plagiarism pairs per problem: 4
+- Legitimate pairs per problem: 186 (190 total - 4 plagiarism)
+"""
+
+
+@lru_cache(maxsize=None)
+def _get_detector(name: str):
+    """Return this process's shared detector instance for 'token', 'ast' or 'hash'"""
+    from src.detectors.token_detector import TokenDetector
+    from src.detectors.ast_detector import ASTDetector
+    from src.detectors.hash_detector import HashDetector
+
+    detector_classes = {'token': TokenDetector, 'ast': ASTDetector, 'hash': HashDetector}
+    return detector_classes[name]()
+
+
+def _init_worker(detector_names: Tuple[str, ...]) -> None:
+    """
+    Pool initializer: build the worker's detectors before it takes any tasks.
+
+    _get_detector keeps them for the life of the process, so each worker
+    constructs every detector exactly once and reuses it for all its pairs.
+    """
+    for name in detector_names:
+        _get_detector(name)
+
+
+@lru_cache(maxsize=64)
+def _read_source(path: str) -> str:
+    """Read a file once for all the detectors that prepare it"""
+    return Path(path).read_text()
+
+
+@lru_cache(maxsize=64)
+def _semantic_tokens(path: str) -> List[str]:
+    """Tokenize a file once for both the token and the hash detector"""
+    return _get_detector('hash')._tokenize(_read_source(path))
+
+
+@lru_cache(maxsize=512)
+def _prepared_features(path: str, name: str):
+    """
+    Read a file and preprocess it for one detector.
+
+    Each file takes part in N-1 pairs, so its tokens, normalized AST and
+    fingerprints are computed once per process instead of once per pair.
+    The token and hash detectors share a single tokenize pass.
+    """
+    if name in ('token', 'hash'):
+        return _get_detector(name).prepare_tokens(_semantic_tokens(path))
+    return _get_detector(name).prepare(_read_source(path))
+
+
+def _score_pair(task: Tuple[str, str, Tuple[str, ...]]) -> Dict[str, float]:
+    """
+    Run the requested detectors on one pair of files.
+
+    Module-level so it can be sent to a multiprocessing.Pool worker.
+
+    Args:
+        task: (file1 path, file2 path, detector names to run)
+
+    Returns:
+        Dict mapping each requested detector name to its similarity score
+    """
+    path1, path2, detector_names = task
+    return {
+        name: _get_detector(name).compare_prepared(
+            _prepared_features(path1, name), _prepared_features(path2, name)
+        )
+        for name in detector_names
+    }
+
+
+def _score_indexed_pair(
+    task: Tuple[int, str, str, Tuple[str, ...]]
+) -> Tuple[int, Tuple[float, ...]]:
+    """
+    Pool worker wrapper around _score_pair with a compact result.
+
+    Returns the task index and the scores in the order of the requested
+    detector names, so only a small tuple is pickled back to the parent.
+    """
+    index, path1, path2, detector_names = task
+    scores = _score_pair((path1, path2, detector_names))
+    return index, tuple(scores[name] for name in detector_names)
+
+
+@dataclass(slots=True)
 class ComparisonResult:
-    """Stores results of a single file pair comparison"""
+    """Stores results of a single file pair comparison (one per pair and mode)"""
     file1: str
     file2: str
     mode: str
@@ -61,7 +217,7 @@ class ComparisonResult:
     is_ground_truth_plagiarism: bool
     token_score: float
     ast_score: float
-    hash_score: float
+    hash_score: Optional[float]  # None when the mode skips the hash detector
     confidence: float
     total_votes: float
     file1_lines: int
@@ -116,11 +272,132 @@ class ModeComparator:
         }
     }
 
-    def __init__(self):
-        """Initialize mode comparator"""
+    # Student numbers of the known plagiarism pairs, the same in every problem
+    GROUND_TRUTH_STUDENTS = (
+        (3, 1),  # Direct copy
+        (4, 1),  # Identifier renaming
+        (5, 1),  # Frankenstein part 1
+        (5, 2),  # Frankenstein part 2
+    )
+
+    # Detection modes compared for every problem (preset name is the lowercase mode)
+    MODES = ('SIMPLE', 'STANDARD')
+
+    # Number of comparisons between progress messages
+    PROGRESS_INTERVAL = 20
+
+    # Threads reading files ahead of the hashing/line counting loop
+    IO_WORKERS = 4
+
+    # Columns of the detailed results CSV (ComparisonResult attributes)
+    RESULT_FIELDS = [
+        'file1', 'file2', 'mode', 'is_plagiarism_detected',
+        'is_ground_truth_plagiarism', 'token_score', 'ast_score',
+        'hash_score', 'confidence', 'total_votes',
+        'file1_lines', 'file2_lines'
+    ]
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_path: Optional[Path] = None,
+        show_progress: bool = True,
+        min_size_ratio: float = 0.0
+    ):
+        """
+        Initialize mode comparator
+
+        Args:
+            workers: Number of processes used to run the detectors
+                (default: os.cpu_count()). 1 runs everything in-process.
+            cache_path: JSON file holding detector scores from earlier runs.
+                None disables the persistent cache.
+            show_progress: Print a progress line every PROGRESS_INTERVAL pairs
+            min_size_ratio: Pairs whose smaller/larger file size ratio falls
+                below this are recorded as not plagiarized without running
+                the detectors. 0.0 (default) compares every pair.
+        """
+        from src.core.config_presets import get_preset_config
+
+        self.workers = workers or os.cpu_count() or 1
+        self.show_progress = show_progress
+        self.min_size_ratio = min_size_ratio
         self.results: List[ComparisonResult] = []
         self.metrics: List[ModeMetrics] = []
 
+        # Batches of results for the background CSV writer while streaming
+        # (see stream_results_csv), None otherwise
+        self._result_queue: Optional[queue.Queue] = None
+
+        # Resolve each mode's preset once instead of once per problem
+        self.mode_configs: Dict[str, Dict] = {
+            mode: get_preset_config(mode.lower()) for mode in self.MODES
+        }
+
+        # SHA-256 of each file's bytes, and detector scores keyed by the
+        # (digest1, digest2) pair. Detector scores don't depend on the mode,
+        # and byte-identical files share every score, so each distinct
+        # content pair is only ever run through the detectors once.
+        self._file_digests: Dict[Path, bytes] = {}
+        self._line_counts: Dict[Path, int] = {}
+        self._file_names: Dict[Path, str] = {}
+        self._file_sizes: Dict[Path, int] = {}
+        self._score_cache: Dict[Tuple[bytes, bytes], Dict[str, float]] = {}
+
+        # Scores from earlier runs stay valid until the detector code changes
+        self.cache_path = cache_path
+        self._detector_version = self._get_detector_version()
+        if cache_path is not None:
+            self._load_score_cache()
+
+    def _get_detector_version(self) -> str:
+        """Fingerprint the sources that produced the cached scores"""
+        digest = hashlib.sha256()
+        for source in DETECTOR_SOURCES:
+            digest.update(source.read_bytes())
+        return digest.hexdigest()
+
+    def _load_score_cache(self) -> None:
+        """Load cached detector scores, ignoring stale or unreadable caches"""
+        try:
+            data = self.cache_path.read_bytes()
+            cached = orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(cached, dict) or cached.get('detector_version') != self._detector_version:
+            return
+
+        try:
+            score_cache = {}
+            for key, scores in cached.get('scores', {}).items():
+                digest1, digest2 = key.split(':')
+                score_cache[(bytes.fromhex(digest1), bytes.fromhex(digest2))] = scores
+        except (ValueError, AttributeError):
+            return
+        self._score_cache = score_cache
+
+        print(f"Loaded {len(self._score_cache)} cached score sets from {self.cache_path}")
+
+    def save_score_cache(self) -> None:
+        """Persist detector scores so later runs skip unchanged file pairs"""
+        if self.cache_path is None:
+            return
+
+        cache = {
+            'detector_version': self._detector_version,
+            'scores': {
+                f"{digest1.hex()}:{digest2.hex()}": scores
+                for (digest1, digest2), scores in self._score_cache.items()
+            },
+        }
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            self.cache_path.write_bytes(orjson.dumps(cache))
+        else:
+            self.cache_path.write_text(json.dumps(cache))
+
     def _get_ground_truth_pairs(self, problem_name: str) -> Set[Tuple[str, str]]:
         """
         Get the set of plagiarism pairs for a problem.
@@ -131,41 +408,24 @@ class ModeComparator:
         Returns:
             Set of (file1, file2) tuples representing plagiarism pairs
         """
+        # Zero-padded (student_01.py) or plain (student_1.py) filenames
         file_pattern = self.TEST_PROBLEMS[problem_name]['file_pattern']
 
-        # Generate filenames based on pattern
-        if '{:02d}' in file_pattern:
-            # Zero-padded format (FizzBuzz, RockPaperScissors)
-            student_1 = file_pattern.format(1)   # student_01.py
-            student_2 = file_pattern.format(2)   # student_02.py
-            student_3 = file_pattern.format(3)   # student_03.py
-            student_4 = file_pattern.format(4)   # student_04.py
-            student_5 = file_pattern.format(5)   # student_05.py
-        else:
-            # Non-padded format (astar, inventory)
-            student_1 = file_pattern.format(1)   # student_1.py
-            student_2 = file_pattern.format(2)   # student_2.py
-            student_3 = file_pattern.format(3)   # student_3.py
-            student_4 = file_pattern.format(4)   # student_4.py
-            student_5 = file_pattern.format(5)   # student_5.py
-
-        # Define plagiarism pairs (order-independent)
-        ground_truth = {
-            tuple(sorted([student_3, student_1])),  # Direct copy
-            tuple(sorted([student_4, student_1])),  # Identifier renaming
-            tuple(sorted([student_5, student_1])),  # Frankenstein part 1
-            tuple(sorted([student_5, student_2])),  # Frankenstein part 2
+        # Plagiarism pairs are order-independent
+        return {
+            tuple(sorted([file_pattern.format(a), file_pattern.format(b)]))
+            for a, b in self.GROUND_TRUTH_STUDENTS
         }
 
-        return ground_truth
-
-    def _count_lines(self, file_path: Path) -> int:
-        """Count non-empty lines in a file"""
+    def _count_lines(self, source: bytes) -> int:
+        """Count non-empty lines in a file's raw contents"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for line in f if line.strip())
-        except Exception:
+            text = source.decode('utf-8')
+        except UnicodeDecodeError:
             return 0
+        # Same line splitting as iterating over a text-mode file
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        return sum(1 for line in lines if line.strip())
 
     def _categorize_size(self, lines: int) -> str:
         """Categorize file by size"""
@@ -178,29 +438,45 @@ class ModeComparator:
 
     def _get_all_files(self, problem_path: Path, file_pattern: str) -> List[Path]:
         """Get all student files for a problem"""
-        files = []
+        entries = []
 
         # Try both legitimate and plagiarized/plagiarised subdirectories
         for subdir in ['legitimate', 'plagiarized', 'plagiarised']:
             subdir_path = problem_path / subdir
-            if subdir_path.exists():
-                # Collect all .py files matching pattern
-                for f in sorted(subdir_path.glob('*.py')):
-                    if not f.name.startswith('__'):
-                        files.append(f)
+            if subdir_path.is_dir():
+                # Collect all .py files; DirEntry caches the file type from
+                # the directory read, so no extra stat() per file
+                with os.scandir(subdir_path) as it:
+                    entries.extend(
+                        (subdir, entry.name, entry.path)
+                        for entry in it
+                        if entry.name.endswith('.py')
+                        and not entry.name.startswith('__')
+                        and entry.is_file()
+                    )
 
-        return sorted(files)
+        # Sorting on (subdir, name) strings matches the old full-path order
+        # without going through Path comparisons
+        entries.sort()
+        return [Path(path) for _, _, path in entries]
+
+    def _is_size_pruned(self, file1: Path, file2: Path) -> bool:
+        """Whether the pair's file sizes differ too much to be worth comparing"""
+        if self.min_size_ratio <= 0.0:
+            return False
+        size1 = self._file_sizes[file1]
+        size2 = self._file_sizes[file2]
+        larger = max(size1, size2)
+        return larger > 0 and min(size1, size2) < self.min_size_ratio * larger
 
     def _run_comparison(
         self,
         file1: Path,
         file2: Path,
         mode_name: str,
-        voting_system: VotingSystem,
-        token_detector: TokenDetector,
-        ast_detector: ASTDetector,
-        hash_detector: HashDetector,
-        ground_truth: Set[Tuple[str, str]]
+        voting_system: 'VotingSystem',
+        is_ground_truth: bool,
+        use_hash: bool = True
     ) -> ComparisonResult:
         """
         Run a single pairwise comparison in the specified mode.
@@ -210,33 +486,57 @@ class ModeComparator:
             file2: Second file path
             mode_name: "SIMPLE" or "STANDARD"
             voting_system: Configured voting system
-            token_detector: Token detector instance
-            ast_detector: AST detector instance
-            hash_detector: Hash detector instance
-            ground_truth: Set of plagiarism pairs
+            is_ground_truth: Whether this pair is a known plagiarism pair
+            use_hash: Whether the hash detector carries any weight in this mode.
+                When False the hash detector is skipped: it votes with 0.0 and
+                the result records no hash score.
 
         Returns:
             ComparisonResult with detection outcome and metrics
         """
-        # Get similarity scores from each detector
-        token_score = token_detector.compare(file1.read_text(), file2.read_text())
-        ast_score = ast_detector.compare(file1.read_text(), file2.read_text())
-        hash_score = hash_detector.compare(file1.read_text(), file2.read_text())
-
-        # Run voting system
-        vote_result = voting_system.vote(token_score, ast_score, hash_score)
-
-        # Check if this pair is in ground truth
-        pair_key = tuple(sorted([file1.name, file2.name]))
-        is_ground_truth = pair_key in ground_truth
-
-        # Count lines
-        file1_lines = self._count_lines(file1)
-        file2_lines = self._count_lines(file2)
+        # Line counts and names were taken when the files were fingerprinted
+        file1_lines = self._line_counts[file1]
+        file2_lines = self._line_counts[file2]
+
+        if self._is_size_pruned(file1, file2):
+            return ComparisonResult(
+                file1=self._file_names[file1],
+                file2=self._file_names[file2],
+                mode=mode_name,
+                is_plagiarism_detected=False,
+                is_ground_truth_plagiarism=is_ground_truth,
+                token_score=0.0,
+                ast_score=0.0,
+                hash_score=0.0,
+                confidence=0.0,
+                total_votes=0.0,
+                file1_lines=file1_lines,
+                file2_lines=file2_lines
+            )
+
+        # Get similarity scores from each detector, reusing any scores already
+        # computed for the same pair of file contents
+        scores = self._score_cache.setdefault(
+            (self._file_digests[file1], self._file_digests[file2]), {}
+        )
+        # A zero-weight detector cannot affect the vote, so don't pay for it
+        needed = ('token', 'ast', 'hash') if use_hash else ('token', 'ast')
+        missing = tuple(name for name in needed if name not in scores)
+        if missing:
+            scores.update(_score_pair((str(file1), str(file2), missing)))
+
+        token_score = scores['token']
+        ast_score = scores['ast']
+        hash_score = scores['hash'] if use_hash else None
+
+        # Run voting system (a skipped hash detector has zero weight anyway)
+        vote_result = voting_system.vote(
+            token_score, ast_score, hash_score if hash_score is not None else 0.0
+        )
 
         return ComparisonResult(
-            file1=file1.name,
-            file2=file2.name,
+            file1=self._file_names[file1],
+            file2=self._file_names[file2],
             mode=mode_name,
             is_plagiarism_detected=vote_result['is_plagiarized'],
             is_ground_truth_plagiarism=is_ground_truth,
@@ -249,6 +549,67 @@ class ModeComparator:
             file2_lines=file2_lines
         )
 
+    def _prefetch_scores(
+        self,
+        all_pairs: List[Tuple[Path, Path, bool]],
+        use_hash: bool
+    ) -> bool:
+        """
+        Fill the score cache for all pairs using a pool of worker processes.
+
+        Only content pairs that are missing a detector score are dispatched,
+        and progress is reported as they complete. With a single worker (or
+        a single pair) this is a no-op and _run_comparison computes the
+        scores in-process as before.
+
+        Args:
+            all_pairs: (file1, file2, is_ground_truth) tuples to be compared
+            use_hash: Whether hash scores are needed in this mode
+
+        Returns:
+            True if the scores were computed on the pool, False if the
+            comparisons will compute them
+        """
+        needed = ('token', 'ast', 'hash') if use_hash else ('token', 'ast')
+
+        tasks: Dict[Tuple[bytes, bytes], Tuple[str, str, Tuple[str, ...]]] = {}
+        for file1, file2, _ in all_pairs:
+            if self._is_size_pruned(file1, file2):
+                continue
+            key = (self._file_digests[file1], self._file_digests[file2])
+            if key in tasks:
+                continue
+            cached = self._score_cache.get(key, {})
+            missing = tuple(name for name in needed if name not in cached)
+            if missing:
+                tasks[key] = (str(file1), str(file2), missing)
+
+        if self.workers <= 1 or len(tasks) < 2:
+            return False
+
+        keys = list(tasks)
+        indexed_tasks = [(index, *tasks[key]) for index, key in enumerate(keys)]
+
+        # Send several pairs per round-trip to amortize pickling/IPC, and
+        # take results in completion order
+        workers = min(self.workers, len(tasks))
+        chunksize = max(1, len(indexed_tasks) // (workers * 8))
+
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(needed,)
+        ) as pool:
+            for completed, (index, scores) in enumerate(pool.imap_unordered(
+                _score_indexed_pair, indexed_tasks, chunksize
+            ), 1):
+                detector_names = indexed_tasks[index][3]
+                self._score_cache.setdefault(keys[index], {}).update(
+                    zip(detector_names, scores)
+                )
+                if self.show_progress and completed % self.PROGRESS_INTERVAL == 0:
+                    print(f"  Progress: {completed}/{len(indexed_tasks)} pairs scored...")
+
+        return True
+
     def _calculate_metrics(
         self,
         results: List[ComparisonResult],
@@ -268,17 +629,15 @@ class ModeComparator:
         Returns:
             ModeMetrics with all calculated metrics
         """
-        tp = fp = tn = fn = 0
-
-        for result in results:
-            if result.is_ground_truth_plagiarism and result.is_plagiarism_detected:
-                tp += 1  # True Positive: correctly detected plagiarism
-            elif not result.is_ground_truth_plagiarism and result.is_plagiarism_detected:
-                fp += 1  # False Positive: incorrectly flagged legitimate as plagiarism
-            elif not result.is_ground_truth_plagiarism and not result.is_plagiarism_detected:
-                tn += 1  # True Negative: correctly identified legitimate
-            elif result.is_ground_truth_plagiarism and not result.is_plagiarism_detected:
-                fn += 1  # False Negative: missed plagiarism
+        # Tally (ground truth, detected) outcomes in a single counting pass
+        outcomes = Counter(
+            (result.is_ground_truth_plagiarism, result.is_plagiarism_detected)
+            for result in results
+        )
+        tp = outcomes[True, True]    # True Positive: correctly detected plagiarism
+        fp = outcomes[False, True]   # False Positive: incorrectly flagged legitimate as plagiarism
+        tn = outcomes[False, False]  # True Negative: correctly identified legitimate
+        fn = outcomes[True, False]   # False Negative: missed plagiarism
 
         # Calculate metrics (handle division by zero)
         precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
@@ -309,6 +668,8 @@ class ModeComparator:
             problem_name: Name of the problem
             problem_config: Problem configuration dict
         """
+        from src.voting.voting_system import VotingSystem
+
         print(f"\n{'='*80}")
         print(f"ANALYZING: {problem_name}")
         print(f"{'='*80}")
@@ -326,45 +687,76 @@ class ModeComparator:
             print(f"ERROR: Not enough files found for {problem_name}")
             return
 
+        # Read each file once: the digest lets identical submissions share
+        # detector work, and the line count is reused by every pair.
+        # Reads run ahead on a thread pool while earlier files are processed.
+        with ThreadPoolExecutor(max_workers=self.IO_WORKERS) as io_pool:
+            for f, source in zip(all_files, io_pool.map(Path.read_bytes, all_files)):
+                self._file_digests[f] = hashlib.sha256(source).digest()
+                self._line_counts[f] = self._count_lines(source)
+                self._file_names[f] = f.name
+                self._file_sizes[f] = len(source)
+
         # Get ground truth plagiarism pairs
         ground_truth = self._get_ground_truth_pairs(problem_name)
         print(f"Ground truth contains {len(ground_truth)} plagiarism pairs")
 
-        # Generate all pairs
-        all_pairs = list(combinations(all_files, 2))
+        # Generate all pairs, resolving ground truth once per pair (not per mode).
+        # Files are keyed by their index so each pair is a single int key.
+        num_files = len(all_files)
+        file_index = {self._file_names[f]: idx for idx, f in enumerate(all_files)}
+        ground_truth_keys = {
+            min(file_index[a], file_index[b]) * num_files + max(file_index[a], file_index[b])
+            for a, b in ground_truth
+            if a in file_index and b in file_index
+        }
+        all_pairs = [
+            (all_files[i], all_files[j], i * num_files + j in ground_truth_keys)
+            for i, j in combinations(range(num_files), 2)
+        ]
         print(f"Total pairs to compare: {len(all_pairs)}")
 
         # Run comparisons in both modes
-        for mode_name in ['SIMPLE', 'STANDARD']:
+        for mode_name in self.MODES:
             print(f"\n{'-'*80}")
             print(f"Running {mode_name} mode...")
             print(f"{'-'*80}")
 
-            # Get mode configuration
-            mode_config = get_preset_config(mode_name.lower())
+            # Get mode configuration (hoisted out of the pair loop)
+            mode_config = self.mode_configs[mode_name]
+            use_hash = mode_config['hash']['weight'] > 0
 
-            # Initialize detectors and voting system
+            # Initialize voting system (detectors are shared, see _get_detector)
             voting_system = VotingSystem(mode_config)
-            token_detector = TokenDetector()
-            ast_detector = ASTDetector()
-            hash_detector = HashDetector()
 
             # Track time
             start_time = time.time()
 
-            # Run all comparisons
+            # Score the pairs on all cores up front (reporting progress as
+            # they finish); the loop below then only votes and picks the
+            # scores out of the cache
+            prefetched = self._prefetch_scores(all_pairs, use_hash)
+
+            # Run all comparisons in blocks. Without a prefetch the scores
+            # are computed here, so progress is reported between blocks
             mode_results = []
-            for i, (file1, file2) in enumerate(all_pairs):
-                if (i + 1) % 20 == 0:
-                    print(f"  Progress: {i + 1}/{len(all_pairs)} comparisons...")
-
-                result = self._run_comparison(
-                    file1, file2, mode_name, voting_system,
-                    token_detector, ast_detector, hash_detector,
-                    ground_truth
-                )
-                mode_results.append(result)
-                self.results.append(result)
+            total_pairs = len(all_pairs)
+            for block_start in range(0, total_pairs, self.PROGRESS_INTERVAL):
+                block = all_pairs[block_start:block_start + self.PROGRESS_INTERVAL]
+                for file1, file2, is_ground_truth in block:
+                    mode_results.append(self._run_comparison(
+                        file1, file2, mode_name, voting_system,
+                        is_ground_truth, use_hash
+                    ))
+
+                completed = block_start + len(block)
+                if (self.show_progress and not prefetched
+                        and completed % self.PROGRESS_INTERVAL == 0):
+                    print(f"  Progress: {completed}/{total_pairs} comparisons...")
+
+            self.results.extend(mode_results)
+            if self._result_queue is not None:
+                self._result_queue.put(mode_results)
 
             execution_time = time.time() - start_time
 
@@ -381,22 +773,67 @@ class ModeComparator:
             print(f"  Accuracy: {metrics.accuracy*100:.2f}%")
             print(f"  Execution time: {execution_time:.2f}s")
 
-    def save_results_csv(self, output_path: Path) -> None:
-        """Save detailed results to CSV"""
-        print(f"\nSaving detailed results to {output_path}...")
+    @contextmanager
+    def stream_results_csv(self, output_path: Path) -> Iterator[None]:
+        """
+        Write detailed results to CSV in the background while problems run.
+
+        Each mode's results are handed to a writer thread as soon as they
+        are complete, so the CSV is written while the next batch is being
+        compared. Rows go to a temporary file next to output_path, which
+        replaces it atomically on a clean exit and is discarded otherwise.
+        The header is RESULT_FIELDS, with one row per ComparisonResult.
 
-        with open(output_path, 'w', newline='') as f:
-            fieldnames = [
-                'file1', 'file2', 'mode', 'is_plagiarism_detected',
-                'is_ground_truth_plagiarism', 'token_score', 'ast_score',
-                'hash_score', 'confidence', 'total_votes',
-                'file1_lines', 'file2_lines'
-            ]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        Args:
+            output_path: Final location of the CSV file
+        """
+        print(f"\nStreaming detailed results to {output_path}...")
 
-            for result in self.results:
-                writer.writerow(asdict(result))
+        fd, tmp_name = tempfile.mkstemp(
+            dir=output_path.parent, prefix=f".{output_path.name}.", suffix='.tmp'
+        )
+        tmp_path = Path(tmp_name)
+        row_values = attrgetter(*self.RESULT_FIELDS)
+        results: queue.Queue = queue.Queue()
+        errors: List[BaseException] = []
+
+        def write_rows() -> None:
+            try:
+                with open(fd, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(self.RESULT_FIELDS)
+                    while (batch := results.get()) is not None:
+                        writer.writerows(row_values(result) for result in batch)
+            except BaseException as e:
+                errors.append(e)
+                # Keep draining so producers never block on a dead writer
+                while results.get() is not None:
+                    pass
+
+        writer_thread = threading.Thread(target=write_rows, daemon=True)
+        writer_thread.start()
+        self._result_queue = results
+        try:
+            yield
+        except BaseException:
+            results.put(None)
+            writer_thread.join()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            self._result_queue = None
+
+        results.put(None)
+        writer_thread.join()
+        if errors:
+            tmp_path.unlink(missing_ok=True)
+            raise errors[0]
+        # mkstemp creates the file as 0600; publish it with the mode a plain
+        # open() would have given it under the current umask
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, output_path)
 
     def save_metrics_csv(self, output_path: Path) -> None:
         """Save metrics summary to CSV"""
@@ -420,6 +857,11 @@ class ModeComparator:
 
         lines = []
 
+        # Each (problem, mode) metrics row, looked up by every section below
+        metrics_by_key: Dict[Tuple[str, str], ModeMetrics] = {}
+        for m in self.metrics:
+            metrics_by_key.setdefault((m.problem, m.mode), m)
+
         # Header
         lines.append("# CodeGuard Mode Effectiveness Analysis")
         lines.append("")
@@ -458,14 +900,9 @@ class ModeComparator:
         for problem_name in self.TEST_PROBLEMS.keys():
             for mode_name in ['SIMPLE', 'STANDARD']:
                 # Find metrics for this problem/mode
-                metrics = next((m for m in self.metrics if m.problem == problem_name and m.mode == mode_name), None)
+                metrics = metrics_by_key.get((problem_name, mode_name))
                 if metrics:
-                    lines.append(
-                        f"| {problem_name} | {mode_name} | "
-                        f"{metrics.tp} | {metrics.fp} | {metrics.tn} | {metrics.fn} | "
-                        f"{metrics.precision*100:.2f}% | {metrics.recall*100:.2f}% | "
-                        f"{metrics.f1:.4f} | {metrics.accuracy*100:.2f}% |"
-                    )
+                    lines.append(DETAILED_RESULTS_ROW.format_map(asdict(metrics)))
 
         lines.append("")
 
@@ -479,8 +916,8 @@ class ModeComparator:
             lines.append(f"**Description:** {config['description']}")
             lines.append("")
 
-            simple_metrics = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'SIMPLE'), None)
-            standard_metrics = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'STANDARD'), None)
+            simple_metrics = metrics_by_key.get((problem_name, 'SIMPLE'))
+            standard_metrics = metrics_by_key.get((problem_name, 'STANDARD'))
 
             if simple_metrics and standard_metrics:
                 lines.append("| Metric | SIMPLE | STANDARD | Winner |")
@@ -517,35 +954,43 @@ class ModeComparator:
         lines.append("### Performance by File Size Category")
         lines.append("")
 
-        # Categorize results by file size
-        small_results = [r for r in self.results if self._categorize_size(max(r.file1_lines, r.file2_lines)) == 'small']
-        medium_results = [r for r in self.results if self._categorize_size(max(r.file1_lines, r.file2_lines)) == 'medium']
-        large_results = [r for r in self.results if self._categorize_size(max(r.file1_lines, r.file2_lines)) == 'large']
+        # Categorize results by file size and tally each mode's outcomes in
+        # a single pass: (category, mode) -> [results, tp, fp, fn]
+        category_counts: Dict[Tuple[str, str], List[int]] = {}
+        for r in self.results:
+            key = (self._categorize_size(max(r.file1_lines, r.file2_lines)), r.mode)
+            counts = category_counts.setdefault(key, [0, 0, 0, 0])
+            counts[0] += 1
+            if r.is_plagiarism_detected:
+                counts[1 if r.is_ground_truth_plagiarism else 2] += 1
+            elif r.is_ground_truth_plagiarism:
+                counts[3] += 1
+
+        # Calculate F1 for one category's counts
+        def calc_f1(counts):
+            _, tp, fp, fn = counts
+
+            precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+            recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+            return 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
 
         lines.append("| Size Category | Files | SIMPLE F1 | STANDARD F1 | Recommended Mode |")
         lines.append("|---------------|-------|-----------|-------------|------------------|")
 
-        for category, cat_results in [('Small (<50 lines)', small_results), ('Medium (50-150)', medium_results), ('Large (>150)', large_results)]:
-            if cat_results:
-                simple_cat = [r for r in cat_results if r.mode == 'SIMPLE']
-                standard_cat = [r for r in cat_results if r.mode == 'STANDARD']
+        for size, category in [('small', 'Small (<50 lines)'), ('medium', 'Medium (50-150)'), ('large', 'Large (>150)')]:
+            cat_total = sum(
+                counts[0] for (cat_size, _), counts in category_counts.items() if cat_size == size
+            )
+            if cat_total:
+                simple_counts = category_counts.get((size, 'SIMPLE'))
+                standard_counts = category_counts.get((size, 'STANDARD'))
 
-                # Calculate F1 for this category
-                def calc_f1(results):
-                    tp = sum(1 for r in results if r.is_ground_truth_plagiarism and r.is_plagiarism_detected)
-                    fp = sum(1 for r in results if not r.is_ground_truth_plagiarism and r.is_plagiarism_detected)
-                    fn = sum(1 for r in results if r.is_ground_truth_plagiarism and not r.is_plagiarism_detected)
-
-                    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-                    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-                    return 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-
-                simple_f1 = calc_f1(simple_cat) if simple_cat else 0
-                standard_f1 = calc_f1(standard_cat) if standard_cat else 0
+                simple_f1 = calc_f1(simple_counts) if simple_counts else 0
+                standard_f1 = calc_f1(standard_counts) if standard_counts else 0
 
                 recommended = "SIMPLE" if simple_f1 > standard_f1 else "STANDARD"
 
-                lines.append(f"| {category} | {len(cat_results)//2} | {simple_f1:.4f} | {standard_f1:.4f} | {recommended} |")
+                lines.append(f"| {category} | {cat_total//2} | {simple_f1:.4f} | {standard_f1:.4f} | {recommended} |")
 
         lines.append("")
 
@@ -559,17 +1004,20 @@ class ModeComparator:
         lines.append("|---------|----------------|------------------|------------|")
 
         for problem_name in self.TEST_PROBLEMS.keys():
-            simple_m = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'SIMPLE'), None)
-            standard_m = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'STANDARD'), None)
+            simple_m = metrics_by_key.get((problem_name, 'SIMPLE'))
+            standard_m = metrics_by_key.get((problem_name, 'STANDARD'))
 
             if simple_m and standard_m:
-                simple_fpr = simple_m.fp / (simple_m.fp + simple_m.tn) if (simple_m.fp + simple_m.tn) > 0 else 0
-                standard_fpr = standard_m.fp / (standard_m.fp + standard_m.tn) if (standard_m.fp + standard_m.tn) > 0 else 0
+                # Legitimate pairs: the FP rate denominator, also shown in the row
+                simple_negatives = simple_m.fp + simple_m.tn
+                standard_negatives = standard_m.fp + standard_m.tn
+                simple_fpr = simple_m.fp / simple_negatives if simple_negatives > 0 else 0
+                standard_fpr = standard_m.fp / standard_negatives if standard_negatives > 0 else 0
 
                 lower = "SIMPLE" if simple_fpr < standard_fpr else "STANDARD" if standard_fpr < simple_fpr else "Tie"
 
-                lines.append(f"| {problem_name} | {simple_fpr*100:.2f}% ({simple_m.fp}/{simple_m.fp + simple_m.tn}) | "
-                           f"{standard_fpr*100:.2f}% ({standard_m.fp}/{standard_m.fp + standard_m.tn}) | {lower} |")
+                lines.append(f"| {problem_name} | {simple_fpr*100:.2f}% ({simple_m.fp}/{simple_negatives}) | "
+                           f"{standard_fpr*100:.2f}% ({standard_m.fp}/{standard_negatives}) | {lower} |")
 
         lines.append("")
         lines.append("### False Negative Rates")
@@ -578,65 +1026,28 @@ class ModeComparator:
         lines.append("|---------|----------------|------------------|------------|")
 
         for problem_name in self.TEST_PROBLEMS.keys():
-            simple_m = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'SIMPLE'), None)
-            standard_m = next((m for m in self.metrics if m.problem == problem_name and m.mode == 'STANDARD'), None)
+            simple_m = metrics_by_key.get((problem_name, 'SIMPLE'))
+            standard_m = metrics_by_key.get((problem_name, 'STANDARD'))
 
             if simple_m and standard_m:
-                simple_fnr = simple_m.fn / (simple_m.fn + simple_m.tp) if (simple_m.fn + simple_m.tp) > 0 else 0
-                standard_fnr = standard_m.fn / (standard_m.fn + standard_m.tp) if (standard_m.fn + standard_m.tp) > 0 else 0
+                # Plagiarism pairs: the FN rate denominator, also shown in the row
+                simple_positives = simple_m.fn + simple_m.tp
+                standard_positives = standard_m.fn + standard_m.tp
+                simple_fnr = simple_m.fn / simple_positives if simple_positives > 0 else 0
+                standard_fnr = standard_m.fn / standard_positives if standard_positives > 0 else 0
 
                 lower = "SIMPLE" if simple_fnr < standard_fnr else "STANDARD" if standard_fnr < simple_fnr else "Tie"
 
-                lines.append(f"| {problem_name} | {simple_fnr*100:.2f}% ({simple_m.fn}/{simple_m.fn + simple_m.tp}) | "
-                           f"{standard_fnr*100:.2f}% ({standard_m.fn}/{standard_m.fn + standard_m.tp}) | {lower} |")
-
-        lines.append("")
-
-        # Mode Recommendations
-        lines.append("## Mode Recommendations")
-        lines.append("")
-        lines.append("| Assignment Type | File Size | Recommended Mode | Rationale |")
-        lines.append("|-----------------|-----------|------------------|-----------|")
-        lines.append("| Simple algorithms (FizzBuzz, palindrome) | < 50 lines | SIMPLE | Hash detector disabled reduces false positives on constrained problems |")
-        lines.append("| Medium assignments (games, utilities) | 50-150 lines | STANDARD | All three detectors provide balanced coverage |")
-        lines.append("| Complex projects (web apps, algorithms) | > 150 lines | STANDARD | Hash detector excels at detecting partial/scattered copying |")
-        lines.append("")
-
-        # Conclusions
-        lines.append("## Conclusions and Recommendations")
-        lines.append("")
-        lines.append("### When to Use SIMPLE Mode")
-        lines.append("")
-        lines.append("- Constrained problems with limited solution space (<50 lines)")
-        lines.append("- Assignments where structural similarity is more important than token-level matching")
-        lines.append("- When higher precision is required (fewer false alarms)")
-        lines.append("- Examples: FizzBuzz, Fibonacci, palindrome checkers")
-        lines.append("")
-
-        lines.append("### When to Use STANDARD Mode")
-        lines.append("")
-        lines.append("- Realistic assignments with sufficient code volume (50+ lines)")
-        lines.append("- Projects where partial/scattered copying is a concern")
-        lines.append("- When higher recall is required (catch more plagiarism)")
-        lines.append("- Examples: web applications, data processors, games, complex algorithms")
-        lines.append("")
+                lines.append(f"| {problem_name} | {simple_fnr*100:.2f}% ({simple_m.fn}/{simple_positives}) | "
+                           f"{standard_fnr*100:.2f}% ({standard_m.fn}/{standard_positives}) | {lower} |")
 
-        lines.append("### Key Insights")
-        lines.append("")
-        lines.append("1. **Hash Detector Impact:** Disabling the hash detector in SIMPLE mode significantly reduces false positives on small files")
-        lines.append("2. **AST Detector Reliability:** Both modes rely heavily on AST detection, which proves most reliable across all file sizes")
-        lines.append("3. **Threshold Tuning:** SIMPLE mode's stricter AST threshold (0.85 vs 0.80) helps distinguish plagiarism from natural similarity")
-        lines.append("4. **Trade-offs:** SIMPLE mode favors precision, STANDARD mode balances precision and recall")
         lines.append("")
 
-        lines.append("### Statistical Significance")
-        lines.append("")
-        lines.append(f"- Total comparisons: {len(self.results)}")
-        lines.append(f"- Problems tested: {len(self.TEST_PROBLEMS)}")
-        lines.append(f"- Modes compared: 2 (SIMPLE, STANDARD)")
-        lines.append(f"- Ground truth plagiarism pairs per problem: 4")
-        lines.append(f"- Legitimate pairs per problem: 186 (190 total - 4 plagiarism)")
-        lines.append("")
+        # Static recommendations/conclusions, then the run statistics
+        lines.append(REPORT_CONCLUSIONS_TEMPLATE.format_map({
+            'total_comparisons': len(self.results),
+            'problems_tested': len(self.TEST_PROBLEMS),
+        }))
 
         # Save report
         with open(output_path, 'w') as f:
@@ -645,28 +1056,72 @@ class ModeComparator:
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Compare SIMPLE vs STANDARD detection modes")
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help=f"recompute every detector score instead of reusing {SCORE_CACHE_PATH.name}"
+    )
+    parser.add_argument(
+        '--quiet', action='store_true',
+        help="don't print per-block comparison progress"
+    )
+    parser.add_argument(
+        '--min-size-ratio', type=float, default=0.0, metavar='RATIO',
+        help="skip the detectors for pairs whose smaller/larger file size "
+             "ratio is below RATIO and record them as not plagiarized "
+             "(default: 0, compare every pair)"
+    )
+    args = parser.parse_args()
+
     print("CodeGuard Mode Effectiveness Comparison")
     print("=" * 80)
 
+    # Bail out before loading any detectors if there is no test data to compare
+    missing = [
+        name for name, config in ModeComparator.TEST_PROBLEMS.items()
+        if not Path(config['path']).exists()
+    ]
+    if len(missing) == len(ModeComparator.TEST_PROBLEMS):
+        print("ERROR: No test problem directories found:")
+        for name in missing:
+            print(f"  - {ModeComparator.TEST_PROBLEMS[name]['path']}")
+        return
+
     # Create output directories
     output_dir = Path(__file__).parent.parent / 'analysis_results'
     output_dir.mkdir(exist_ok=True)
 
     # Initialize comparator
-    comparator = ModeComparator()
+    comparator = ModeComparator(
+        cache_path=None if args.no_cache else SCORE_CACHE_PATH,
+        show_progress=not args.quiet,
+        min_size_ratio=args.min_size_ratio
+    )
+
+    # Run comparisons for all problems, writing the detailed CSV as they go
+    with comparator.stream_results_csv(output_dir / 'mode_comparison_detailed.csv'):
+        for problem_name, problem_config in comparator.TEST_PROBLEMS.items():
+            comparator.run_problem_comparison(problem_name, problem_config)
 
-    # Run comparisons for all problems
-    for problem_name, problem_config in comparator.TEST_PROBLEMS.items():
-        comparator.run_problem_comparison(problem_name, problem_config)
+    comparator.save_score_cache()
 
     # Save results
     print("\n" + "="*80)
     print("SAVING RESULTS")
     print("="*80)
 
-    comparator.save_results_csv(output_dir / 'mode_comparison_detailed.csv')
-    comparator.save_metrics_csv(output_dir / 'mode_comparison_metrics.csv')
-    comparator.generate_markdown_report(output_dir.parent / 'docs' / 'MODE_EFFECTIVENESS_ANALYSIS.md')
+    # The detailed CSV is already written; the other two outputs are
+    # independent, so overlap their file I/O
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(comparator.save_metrics_csv, output_dir / 'mode_comparison_metrics.csv'),
+            executor.submit(
+                comparator.generate_markdown_report,
+                output_dir.parent / 'docs' / 'MODE_EFFECTIVENESS_ANALYSIS.md'
+            ),
+        ]
+        for future in futures:
+            future.result()  # Re-raise any write error in the main thread
 
     print("\n" + "="*80)
     print("ANALYSIS COMPLETE")
@@ -7,11 +7,12 @@ multiple test problems of varying complexity. It collects timing, throughput,
 and memory usage metrics to identify bottlenecks and validate scalability.
 
 Metrics Collected:
-- Total processing time (seconds)
+- Total processing time (seconds, wall clock)
+- CPU time (seconds, this process and its workers)
 - Time per file comparison (seconds/comparison)
 - Time per 1000 lines of code (seconds/1000 LOC)
 - Lines processed per second (throughput)
-- Peak memory usage (MB)
+- Peak memory usage (MB, resident set size of a fresh process per run and its workers)
 - Number of comparisons (file pairs)
 - Total lines processed
 
@@ -36,17 +37,23 @@ import time
 import os
 import csv
 import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from datetime import datetime
+from itertools import combinations
 import logging
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.detectors.token_detector import TokenDetector
-from src.detectors.ast_detector import ASTDetector
-from src.detectors.hash_detector import HashDetector
+from src.detectors.pairwise import score_pairs
 from src.voting.voting_system import VotingSystem
 from src.core.config_presets import get_preset_config
 
@@ -64,13 +71,27 @@ logger.setLevel(logging.INFO)
 
 # Benchmark configuration
 NUM_RUNS = 3  # Number of iterations per problem
-WARMUP_RUN = True  # Perform one warmup run to prime caches
+WARMUP_RUN = True  # Warm up on one file pair before each timed run
+IO_WORKERS = 4  # Threads reading problem files concurrently
+TRACE_MEMORY = False  # Measure Python allocations with tracemalloc (slows timed runs many times over)
+
+# Per-run metrics averaged into each problem's summary (as avg_<metric>)
+AVERAGED_METRICS = (
+    'total_time_sec',
+    'cpu_time_sec',
+    'time_per_comparison_sec',
+    'time_per_1000_loc_sec',
+    'lines_per_sec',
+    'peak_memory_mb',
+)
+
+# Test problems live in test_files/<name> next to this script's package
+TEST_FILES_DIR = Path(__file__).resolve().parent.parent / 'test_files'
 
 # Test problem configurations
 TEST_PROBLEMS = [
     {
         'name': 'FizzBuzzProblem',
-        'path': '/Users/michaelthemac/Desktop/Tec/8_Semestre/DAA/Reto/CodeGuard/codeguard/test_files/FizzBuzzProblem',
         'expected_files': 20,
         'expected_lines': 490,
         'description': 'Small files, 20-60 lines per file, simple algorithmic problem',
@@ -78,7 +99,6 @@ TEST_PROBLEMS = [
     },
     {
         'name': 'RockPaperScissors',
-        'path': '/Users/michaelthemac/Desktop/Tec/8_Semestre/DAA/Reto/CodeGuard/codeguard/test_files/RockPaperScissors',
         'expected_files': 20,
         'expected_lines': 2534,
         'description': 'Realistic classroom code, 80-200 lines per file',
@@ -86,7 +106,6 @@ TEST_PROBLEMS = [
     },
     {
         'name': 'astar_pathfinding',
-        'path': '/Users/michaelthemac/Desktop/Tec/8_Semestre/DAA/Reto/CodeGuard/codeguard/test_files/astar_pathfinding',
         'expected_files': 20,
         'expected_lines': 2643,
         'description': 'Medium complexity, algorithm-heavy code',
@@ -94,7 +113,6 @@ TEST_PROBLEMS = [
     },
     {
         'name': 'inventory_ice_cream_shop',
-        'path': '/Users/michaelthemac/Desktop/Tec/8_Semestre/DAA/Reto/CodeGuard/codeguard/test_files/inventory_ice_cream_shop',
         'expected_files': 20,
         'expected_lines': 2924,
         'description': 'Medium complexity, OOP and functional paradigms',
@@ -102,6 +120,18 @@ TEST_PROBLEMS = [
     }
 ]
 
+# Row templates for the report tables, filled from a problem's averaged results
+PERF_ROW = (
+    "| {problem_name} | {total_files} | {total_lines:,} | {total_comparisons} | "
+    "{avg_total_time_sec:.2f} | {avg_time_per_comparison_sec:.4f} | "
+    "{avg_time_per_1000_loc_sec:.4f} | {avg_lines_per_sec:.1f} | "
+    "{avg_peak_memory_mb:.2f} | {preset} |\n"
+)
+EFFICIENCY_ROW = (
+    "| {problem_name} | {total_lines:,} | {avg_time_per_1000_loc_sec:.4f} | "
+    "{efficiency:.2f}x |\n"
+)
+
 # Output directory
 OUTPUT_DIR = Path(__file__).parent.parent / 'docs' / 'performance_data'
 
@@ -110,6 +140,31 @@ OUTPUT_DIR = Path(__file__).parent.parent / 'docs' / 'performance_data'
 # FILE LOADING
 # ============================================================================
 
+def _iter_python_files(directory: Path) -> Iterator[Path]:
+    """
+    Yield the .py files under a directory in the same order as rglob('*.py').
+
+    os.scandir reports each entry's type from the directory listing itself,
+    so unlike rglob() + is_file() no extra stat() is issued per file.
+
+    Args:
+        directory: Directory to walk
+
+    Yields:
+        Paths of regular .py files, depth-first
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.py') and entry.is_file():
+                yield Path(entry.path)
+
+    for subdir in subdirs:
+        yield from _iter_python_files(subdir)
+
+
 def load_python_files(directory: Path) -> List[Tuple[str, str]]:
     """
     Load all Python files from a directory and its subdirectories.
@@ -120,16 +175,27 @@ def load_python_files(directory: Path) -> List[Tuple[str, str]]:
     Returns:
         List of (filename, content) tuples
     """
-    files = []
-    for py_file in directory.rglob('*.py'):
-        try:
-            with open(py_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                files.append((py_file.name, content))
-        except Exception as e:
-            logger.warning(f"Failed to read {py_file}: {e}")
-
-    return files
+    py_files = list(_iter_python_files(directory))
+
+    # Overlap the reads' disk latency; results keep the directory order
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+        contents = list(executor.map(_read_source, py_files))
+
+    return [
+        (py_file.name, content)
+        for py_file, content in zip(py_files, contents)
+        if content is not None
+    ]
+
+
+def _read_source(py_file: Path) -> Optional[str]:
+    """Read one source file, logging a warning and returning None on failure."""
+    try:
+        with open(py_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    except Exception as e:
+        logger.warning(f"Failed to read {py_file}: {e}")
+        return None
 
 
 def count_total_lines(files: List[Tuple[str, str]]) -> int:
@@ -142,79 +208,151 @@ def count_total_lines(files: List[Tuple[str, str]]) -> int:
     Returns:
         Total line count
     """
-    return sum(len(content.splitlines()) for _, content in files)
+    # Files are read in text mode, so every line ending is already '\n';
+    # counting them avoids building a list of lines just to take its length
+    return sum(
+        content.count('\n') + (bool(content) and not content.endswith('\n'))
+        for _, content in files
+    )
 
 
 # ============================================================================
 # BENCHMARKING LOGIC
 # ============================================================================
 
+def _peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process or its finished workers, in MB.
+
+    getrusage() reads a counter the kernel keeps anyway, so unlike
+    tracemalloc it adds no overhead to the timed region. The value is a
+    high-water mark for the life of the process, which is why each
+    benchmark run gets a fresh process (see _isolated_run).
+    """
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _cpu_time_sec() -> float:
+    """
+    CPU seconds used so far by this process and its finished workers.
+
+    Compared with the wall-clock time this tells compute-bound runs apart
+    from ones that wait (I/O, scheduling, worker start-up and IPC).
+    """
+    cpu_time = time.process_time_ns() / 1e9
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_time += children.ru_utime + children.ru_stime
+    return cpu_time
+
+
 def run_detection_analysis(
     files: List[Tuple[str, str]],
     config: Dict[str, Any]
-) -> Tuple[float, float, int]:
+) -> Tuple[float, float, float, int]:
     """
     Run plagiarism detection on all file pairs and measure performance.
 
     This function replicates the core analysis workflow from app.py,
     running all three detectors (Token, AST, Hash) with the VotingSystem.
+    As in the app, the detectors run through score_pairs: each file is
+    prepared once per detector and the pairs are spread over a process
+    pool (see src/detectors/pairwise.py).
 
     Args:
         files: List of (filename, content) tuples
         config: Preset configuration from get_preset_config()
 
     Returns:
-        Tuple of (elapsed_time_seconds, peak_memory_mb, num_comparisons)
+        Tuple of (elapsed_time_seconds, cpu_time_seconds, peak_memory_mb,
+        num_comparisons)
     """
-    # Initialize detectors
-    token_detector = TokenDetector()
-    ast_detector = ASTDetector()
-    hash_detector = HashDetector()
     voting_system = VotingSystem(config)
 
-    # Start memory tracking
-    tracemalloc.start()
+    # tracemalloc hooks every allocation inside the timed region, so peak
+    # RSS from the kernel is used unless allocation tracing is requested
+    trace_memory = TRACE_MEMORY or resource is None
+    if trace_memory:
+        tracemalloc.start()
 
-    # Start timer
+    # Start timers
     start_time = time.perf_counter()
+    cpu_start = _cpu_time_sec()
 
     # Generate all file pairs (N choose 2)
-    num_files = len(files)
+    sources = [content for _, content in files]
+    pairs = list(combinations(range(len(files)), 2))
     num_comparisons = 0
 
-    for i in range(num_files):
-        for j in range(i + 1, num_files):
-            filename1, content1 = files[i]
-            filename2, content2 = files[j]
-
-            try:
-                # Run Token detector
-                token_sim = token_detector.compare(content1, content2)
+    # Hash detector always runs, even when the preset disables its vote
+    for (i, j), scores in zip(pairs, score_pairs(sources, pairs)):
+        filename1, filename2 = files[i][0], files[j][0]
 
-                # Run AST detector
-                ast_sim = ast_detector.compare(content1, content2)
+        if scores['errors']:
+            logger.warning(
+                f"Error comparing {filename1} vs {filename2}: "
+                f"{'; '.join(scores['errors'].values())}"
+            )
+            continue
 
-                # Run Hash detector (may be disabled in config)
-                hash_sim = hash_detector.compare(content1, content2)
+        try:
+            token_sim = (scores['token_jaccard'] + scores['token_cosine']) / 2.0
 
-                # Use voting system to make decision
-                result = voting_system.vote(token_sim, ast_sim, hash_sim)
+            # Use voting system to make decision
+            voting_system.vote(token_sim, scores['ast'], scores['hash'])
 
-                num_comparisons += 1
+            num_comparisons += 1
 
-            except Exception as e:
-                logger.warning(f"Error comparing {filename1} vs {filename2}: {e}")
-                continue
+        except Exception as e:
+            logger.warning(f"Error comparing {filename1} vs {filename2}: {e}")
+            continue
 
-    # Stop timer
+    # Stop timers
     elapsed_time = time.perf_counter() - start_time
+    cpu_time = _cpu_time_sec() - cpu_start
 
     # Get peak memory usage
-    current, peak = tracemalloc.get_traced_memory()
-    peak_memory_mb = peak / 1024 / 1024  # Convert bytes to MB
-    tracemalloc.stop()
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        peak_memory_mb = peak / 1024 / 1024  # Convert bytes to MB
+        tracemalloc.stop()
+    else:
+        peak_memory_mb = _peak_rss_mb()
+
+    return elapsed_time, cpu_time, peak_memory_mb, num_comparisons
+
+
+def _isolated_run(
+    files: List[Tuple[str, str]],
+    config: Dict[str, Any],
+    warmup: bool
+) -> Tuple[float, float, float, int]:
+    """
+    Warm up, then run run_detection_analysis() once, in a fresh process.
+
+    Module-level so it can be sent to a spawned worker. Peak RSS is a
+    high-water mark for a whole process, so measuring each run in its own
+    process is what makes the memory figure per run rather than the
+    largest run seen so far.
+
+    Args:
+        files: List of (filename, content) tuples
+        config: Preset configuration from get_preset_config()
+        warmup: Whether to warm up on a single file pair first
 
-    return elapsed_time, peak_memory_mb, num_comparisons
+    Returns:
+        Same tuple as run_detection_analysis()
+    """
+    # Nothing is JIT-compiled and the files are already in memory; one
+    # pair is enough to load and exercise every detector before timing
+    if warmup:
+        run_detection_analysis(files[:2], config)
+    return run_detection_analysis(files, config)
 
 
 def benchmark_problem(
@@ -228,13 +366,13 @@ def benchmark_problem(
     Args:
         problem: Problem configuration dictionary
         num_runs: Number of benchmark runs to perform
-        warmup: Whether to perform a warmup run first
+        warmup: Whether to warm up on a single file pair before each run
 
     Returns:
         Dictionary containing benchmark results with averages
     """
     problem_name = problem['name']
-    problem_path = Path(problem['path'])
+    problem_path = TEST_FILES_DIR / problem_name
     preset_name = problem.get('preset', 'standard')
 
     logger.info(f"\n{'='*60}")
@@ -266,25 +404,16 @@ def benchmark_problem(
     # Get preset configuration
     config = get_preset_config(preset_name)
 
-    # Warmup run (if enabled)
-    if warmup:
-        logger.info("Performing warmup run...")
-        try:
-            run_detection_analysis(files, config)
-            logger.info("Warmup complete")
-        except Exception as e:
-            logger.error(f"Warmup run failed: {e}")
-
-    # Benchmark runs
+    # Benchmark runs, each in a fresh process so peak memory is per run
     run_results = []
+    spawn_context = multiprocessing.get_context('spawn')
 
     for run_num in range(1, num_runs + 1):
-        logger.info(f"\nRun {run_num}/{num_runs}...")
-
         try:
-            elapsed_time, peak_memory_mb, actual_comparisons = run_detection_analysis(
-                files, config
-            )
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as executor:
+                elapsed_time, cpu_time, peak_memory_mb, actual_comparisons = executor.submit(
+                    _isolated_run, files, config, warmup
+                ).result()
 
             # Calculate metrics
             time_per_comparison = elapsed_time / actual_comparisons if actual_comparisons > 0 else 0
@@ -298,6 +427,7 @@ def benchmark_problem(
                 'total_lines': total_lines,
                 'total_comparisons': actual_comparisons,
                 'total_time_sec': elapsed_time,
+                'cpu_time_sec': cpu_time,
                 'time_per_comparison_sec': time_per_comparison,
                 'time_per_1000_loc_sec': time_per_1000_loc,
                 'lines_per_sec': lines_per_sec,
@@ -307,11 +437,11 @@ def benchmark_problem(
 
             run_results.append(run_result)
 
-            logger.info(f"  Total time: {elapsed_time:.2f}s")
-            logger.info(f"  Time/comparison: {time_per_comparison:.4f}s")
-            logger.info(f"  Time/1000 LOC: {time_per_1000_loc:.4f}s")
-            logger.info(f"  Lines/second: {lines_per_sec:.1f}")
-            logger.info(f"  Peak memory: {peak_memory_mb:.2f} MB")
+            # One line per run; the detailed breakdown is logged with the averages
+            logger.info(
+                f"  Run {run_num}/{num_runs}: {elapsed_time:.2f}s "
+                f"(CPU {cpu_time:.2f}s) | {peak_memory_mb:.1f} MB"
+            )
 
         except Exception as e:
             logger.error(f"Run {run_num} failed: {e}")
@@ -322,7 +452,13 @@ def benchmark_problem(
         logger.error(f"All runs failed for {problem_name}")
         return None
 
-    # Calculate averages
+    # Calculate averages, totalling every averaged metric in one pass
+    totals = dict.fromkeys(AVERAGED_METRICS, 0.0)
+    for run_result in run_results:
+        for metric in AVERAGED_METRICS:
+            totals[metric] += run_result[metric]
+    run_times = [run_result['total_time_sec'] for run_result in run_results]
+
     avg_result = {
         'problem_name': problem_name,
         'num_runs': len(run_results),
@@ -330,19 +466,16 @@ def benchmark_problem(
         'total_lines': total_lines,
         'total_comparisons': num_comparisons,
         'preset': preset_name,
-        'avg_total_time_sec': sum(r['total_time_sec'] for r in run_results) / len(run_results),
-        'avg_time_per_comparison_sec': sum(r['time_per_comparison_sec'] for r in run_results) / len(run_results),
-        'avg_time_per_1000_loc_sec': sum(r['time_per_1000_loc_sec'] for r in run_results) / len(run_results),
-        'avg_lines_per_sec': sum(r['lines_per_sec'] for r in run_results) / len(run_results),
-        'avg_peak_memory_mb': sum(r['peak_memory_mb'] for r in run_results) / len(run_results),
-        'min_total_time_sec': min(r['total_time_sec'] for r in run_results),
-        'max_total_time_sec': max(r['total_time_sec'] for r in run_results),
+        **{f'avg_{metric}': totals[metric] / len(run_results) for metric in AVERAGED_METRICS},
+        'min_total_time_sec': min(run_times),
+        'max_total_time_sec': max(run_times),
         'run_results': run_results
     }
 
     logger.info(f"\n{'='*60}")
     logger.info(f"AVERAGES for {problem_name} ({len(run_results)} runs):")
     logger.info(f"  Total time: {avg_result['avg_total_time_sec']:.2f}s (min: {avg_result['min_total_time_sec']:.2f}s, max: {avg_result['max_total_time_sec']:.2f}s)")
+    logger.info(f"  CPU time: {avg_result['avg_cpu_time_sec']:.2f}s")
     logger.info(f"  Time/comparison: {avg_result['avg_time_per_comparison_sec']:.4f}s")
     logger.info(f"  Time/1000 LOC: {avg_result['avg_time_per_1000_loc_sec']:.4f}s")
     logger.info(f"  Lines/second: {avg_result['avg_lines_per_sec']:.1f}")
@@ -379,6 +512,7 @@ def write_csv_results(problem_results: Dict[str, Any], output_dir: Path) -> None
             'total_lines',
             'total_comparisons',
             'total_time_sec',
+            'cpu_time_sec',
             'time_per_comparison_sec',
             'time_per_1000_loc_sec',
             'lines_per_sec',
@@ -387,8 +521,7 @@ def write_csv_results(problem_results: Dict[str, Any], output_dir: Path) -> None
         ])
 
         writer.writeheader()
-        for run_result in problem_results['run_results']:
-            writer.writerow(run_result)
+        writer.writerows(problem_results['run_results'])
 
     logger.info(f"Wrote results to {output_file}")
 
@@ -402,14 +535,12 @@ def generate_performance_report(all_results: List[Dict[str, Any]], output_dir: P
     Generate PERFORMANCE_REPORT.md with analysis and recommendations.
 
     Args:
-        all_results: List of benchmark results for all problems
+        all_results: List of benchmark results for all problems, sorted by
+            total_lines (main() sorts them once after collection)
         output_dir: Directory containing performance data
     """
     report_path = output_dir.parent / 'PERFORMANCE_REPORT.md'
 
-    # Sort results by total lines for consistent ordering
-    all_results = sorted(all_results, key=lambda x: x['total_lines'])
-
     # Find fastest and slowest
     fastest = min(all_results, key=lambda x: x['avg_time_per_1000_loc_sec'])
     slowest = max(all_results, key=lambda x: x['avg_time_per_1000_loc_sec'])
@@ -419,187 +550,205 @@ def generate_performance_report(all_results: List[Dict[str, Any]], output_dir: P
     total_lines = sum(r['total_lines'] for r in all_results)
     total_comparisons = sum(r['total_comparisons'] for r in all_results)
     total_time = sum(r['avg_total_time_sec'] for r in all_results)
-
-    # Generate report
-    with open(report_path, 'w') as f:
-        f.write("# CodeGuard Performance Benchmark Report\n\n")
-        f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        f.write(f"**Benchmark Configuration:** {NUM_RUNS} runs per problem with warmup\n\n")
-
-        # Executive Summary
-        f.write("## Executive Summary\n\n")
-        f.write(f"This report presents performance benchmarking results for CodeGuard's plagiarism detection system across {len(all_results)} test problems ")
-        f.write(f"comprising {total_files} files ({total_lines:,} total lines of code, {total_comparisons:,} pairwise comparisons).\n\n")
-
-        f.write("**Key Findings:**\n\n")
-        f.write(f"- **Total processing time:** {total_time:.2f} seconds for all {len(all_results)} problems\n")
-        f.write(f"- **Fastest problem:** {fastest['problem_name']} at {fastest['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
-        f.write(f"- **Slowest problem:** {slowest['problem_name']} at {slowest['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
-        f.write(f"- **Average throughput:** {sum(r['avg_lines_per_sec'] for r in all_results) / len(all_results):.1f} lines/second\n")
-        f.write(f"- **Peak memory usage:** {max(r['avg_peak_memory_mb'] for r in all_results):.2f} MB\n\n")
-
-        # Performance Metrics Table
-        f.write("## Performance Metrics\n\n")
-        f.write("| Problem | Files | Lines | Comparisons | Total Time (s) | Time/Comp (s) | Time/1000 LOC (s) | Lines/Sec | Memory (MB) | Preset |\n")
-        f.write("|---------|-------|-------|-------------|----------------|---------------|-------------------|-----------|-------------|--------|\n")
-
-        for result in all_results:
-            f.write(f"| {result['problem_name']} | ")
-            f.write(f"{result['total_files']} | ")
-            f.write(f"{result['total_lines']:,} | ")
-            f.write(f"{result['total_comparisons']} | ")
-            f.write(f"{result['avg_total_time_sec']:.2f} | ")
-            f.write(f"{result['avg_time_per_comparison_sec']:.4f} | ")
-            f.write(f"{result['avg_time_per_1000_loc_sec']:.4f} | ")
-            f.write(f"{result['avg_lines_per_sec']:.1f} | ")
-            f.write(f"{result['avg_peak_memory_mb']:.2f} | ")
-            f.write(f"{result['preset']} |\n")
-
-        f.write("\n")
-
-        # Detailed Analysis
-        f.write("## Detailed Analysis\n\n")
-
-        f.write("### Processing Speed by Problem Size\n\n")
-        f.write("The benchmark results show clear trends in processing speed relative to code volume:\n\n")
-
-        for result in all_results:
-            avg_lines_per_file = result['total_lines'] / result['total_files']
-            f.write(f"**{result['problem_name']}** ({result['total_lines']} lines, avg {avg_lines_per_file:.0f} lines/file):\n")
-            f.write(f"- Total time: {result['avg_total_time_sec']:.2f}s (range: {result['min_total_time_sec']:.2f}s - {result['max_total_time_sec']:.2f}s)\n")
-            f.write(f"- Normalized: {result['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
-            f.write(f"- Throughput: {result['avg_lines_per_sec']:.1f} lines/second\n")
-            f.write(f"- Preset used: {result['preset']}\n\n")
-
-        # Comparison
-        f.write("### Fastest vs Slowest Problem\n\n")
-        f.write(f"**Fastest:** {fastest['problem_name']} processed at {fastest['avg_lines_per_sec']:.1f} lines/sec\n\n")
-        f.write(f"**Slowest:** {slowest['problem_name']} processed at {slowest['avg_lines_per_sec']:.1f} lines/sec\n\n")
-
-        speedup = slowest['avg_time_per_1000_loc_sec'] / fastest['avg_time_per_1000_loc_sec']
-        f.write(f"**Performance ratio:** {speedup:.2f}x (slowest vs fastest)\n\n")
-
-        # Bottleneck Analysis
-        f.write("### Bottleneck Analysis\n\n")
-        f.write("Based on the CodeGuard architecture (Token, AST, Hash detectors with VotingSystem):\n\n")
-        f.write("**Expected detector performance (from CLAUDE.md):**\n")
-        f.write("- Token Detector: Target 5000 lines/second\n")
-        f.write("- AST Detector: Target 1000 lines/second (most expensive)\n")
-        f.write("- Hash Detector: Target 3000 lines/second\n\n")
-
-        avg_throughput = sum(r['avg_lines_per_sec'] for r in all_results) / len(all_results)
-        f.write(f"**Observed average throughput:** {avg_throughput:.1f} lines/second\n\n")
-
-        f.write("**Analysis:**\n")
-        f.write("- The observed throughput suggests the **AST detector is the primary bottleneck**, ")
-        f.write("as expected from the architecture documentation.\n")
-        f.write("- AST parsing and structural comparison are computationally expensive operations.\n")
-        f.write("- The Token and Hash detectors are likely running significantly faster.\n")
-        f.write("- Voting system overhead is minimal (simple weighted aggregation).\n\n")
-
-        # Memory Usage
-        f.write("### Memory Usage\n\n")
-        max_memory = max(r['avg_peak_memory_mb'] for r in all_results)
-        min_memory = min(r['avg_peak_memory_mb'] for r in all_results)
-
-        f.write(f"**Peak memory usage:** {max_memory:.2f} MB ({max(all_results, key=lambda x: x['avg_peak_memory_mb'])['problem_name']})\n")
-        f.write(f"**Minimum memory usage:** {min_memory:.2f} MB ({min(all_results, key=lambda x: x['avg_peak_memory_mb'])['problem_name']})\n\n")
-        f.write("Memory usage is well within acceptable limits for a classroom tool. ")
-        f.write("The system handles all test problems comfortably with less than 100 MB peak memory.\n\n")
-
-        # Line Count Impact
-        f.write("### Line Count Impact on Processing Speed\n\n")
-        f.write("The relationship between code volume and processing time:\n\n")
-
-        # Calculate correlation
-        f.write("| Problem | Total Lines | Time/1000 LOC (s) | Efficiency Ratio |\n")
-        f.write("|---------|-------------|-------------------|------------------|\n")
-
-        baseline_time = all_results[0]['avg_time_per_1000_loc_sec']
-        for result in all_results:
-            efficiency = baseline_time / result['avg_time_per_1000_loc_sec']
-            f.write(f"| {result['problem_name']} | {result['total_lines']:,} | ")
-            f.write(f"{result['avg_time_per_1000_loc_sec']:.4f} | {efficiency:.2f}x |\n")
-
-        f.write("\n")
-        f.write("**Observations:**\n")
-        f.write("- Processing time scales roughly linearly with code volume (as expected for O(n²) pairwise comparisons)\n")
-        f.write("- Smaller files may benefit from better cache locality\n")
-        f.write("- Larger files may incur additional AST parsing overhead\n\n")
-
-        # Recommendations
-        f.write("## Optimization Recommendations\n\n")
-        f.write("### High Priority\n\n")
-        f.write("1. **Optimize AST Detector:**\n")
-        f.write("   - Cache parsed AST trees to avoid re-parsing the same file\n")
-        f.write("   - Consider parallel AST comparison for independent file pairs\n")
-        f.write("   - Profile AST normalization and tree traversal for optimization opportunities\n\n")
-
-        f.write("2. **Implement Result Caching:**\n")
-        f.write("   - Cache pairwise comparison results to avoid redundant computation\n")
-        f.write("   - Use file content hash as cache key\n")
-        f.write("   - Potential speedup: 2-10x for repeated analyses\n\n")
-
-        f.write("3. **Parallelize Detector Execution:**\n")
-        f.write("   - Run Token, AST, and Hash detectors in parallel using threading or multiprocessing\n")
-        f.write("   - Current implementation runs detectors sequentially\n")
-        f.write("   - Estimated speedup: 1.5-2x (limited by AST detector as bottleneck)\n\n")
-
-        f.write("### Medium Priority\n\n")
-        f.write("4. **Batch Processing Optimization:**\n")
-        f.write("   - Process file pairs in batches with multiprocessing pool\n")
-        f.write("   - Distribute work across CPU cores\n")
-        f.write("   - Potential speedup: 2-4x on multi-core systems\n\n")
-
-        f.write("5. **Early Termination Strategy:**\n")
-        f.write("   - If Token detector shows very low similarity (<0.3), skip expensive AST analysis\n")
-        f.write("   - Implement adaptive thresholding based on initial results\n")
-        f.write("   - Reduces unnecessary computation on clearly non-plagiarized pairs\n\n")
-
-        f.write("### Low Priority\n\n")
-        f.write("6. **Memory Optimization:**\n")
-        f.write("   - Current memory usage is acceptable (<100 MB peak)\n")
-        f.write("   - Consider streaming large files instead of loading all into memory\n")
-        f.write("   - Implement garbage collection hints after batch processing\n\n")
-
-        # Overall Assessment
-        f.write("## Overall Assessment: Classroom Suitability\n\n")
-
-        f.write("**Current Performance:**\n")
-        f.write(f"- 20-file assignment: ~{sum(r['avg_total_time_sec'] for r in all_results) / len(all_results):.1f} seconds average\n")
-        f.write(f"- 50-file assignment: ~{(50/20)**2 * sum(r['avg_total_time_sec'] for r in all_results) / len(all_results):.1f} seconds (estimated)\n")
-        f.write(f"- 100-file assignment: ~{(100/20)**2 * sum(r['avg_total_time_sec'] for r in all_results) / len(all_results) / 60:.1f} minutes (estimated)\n\n")
-
-        f.write("**Verdict:** ✅ **ACCEPTABLE for classroom use**\n\n")
-        f.write("**Justification:**\n")
-        f.write("- Processing times are reasonable for typical classroom assignments (20-50 files)\n")
-        f.write("- Sub-minute analysis for small assignments (FizzBuzz: ~{:.1f}s)\n".format(
-            next(r['avg_total_time_sec'] for r in all_results if r['problem_name'] == 'FizzBuzzProblem')
-        ))
-        f.write("- 1-2 minute analysis for medium assignments (RPS, A*: ~{:.1f}s average)\n".format(
-            sum(r['avg_total_time_sec'] for r in all_results if r['problem_name'] != 'FizzBuzzProblem') /
-            sum(1 for r in all_results if r['problem_name'] != 'FizzBuzzProblem')
-        ))
-        f.write("- Memory footprint is minimal (<100 MB)\n")
-        f.write("- System is stable and handles all test cases successfully\n\n")
-
-        f.write("**Recommendations for Production Deployment:**\n")
-        f.write("- Implement AST caching for 2-3x speedup on repeated analyses\n")
-        f.write("- Add progress indicators for assignments with >30 files\n")
-        f.write("- Consider async processing with job queue for large batches (100+ files)\n")
-        f.write("- Set timeout limits (e.g., 10 minutes) for very large assignments\n\n")
-
-        # Appendix
-        f.write("## Appendix: Raw Data\n\n")
-        f.write("Detailed CSV files with individual run results are available in:\n")
-        f.write(f"- `{output_dir.relative_to(output_dir.parent.parent)}/`\n\n")
-
-        f.write("**Files generated:**\n")
-        for result in all_results:
-            f.write(f"- `{result['problem_name']}_benchmark.csv`\n")
-
-        f.write("\n---\n\n")
-        f.write("*This report was automatically generated by scripts/performance_benchmark.py*\n")
+    avg_throughput = sum(r['avg_lines_per_sec'] for r in all_results) / len(all_results)
+
+    # Memory extremes
+    max_memory_result = max(all_results, key=lambda x: x['avg_peak_memory_mb'])
+    min_memory_result = min(all_results, key=lambda x: x['avg_peak_memory_mb'])
+    max_memory = max_memory_result['avg_peak_memory_mb']
+    min_memory = min_memory_result['avg_peak_memory_mb']
+
+    # Generate report into an in-memory buffer and write it out once
+    parts: List[str] = []
+    write = parts.append
+
+    write("# CodeGuard Performance Benchmark Report\n\n")
+    write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    write(f"**Benchmark Configuration:** {NUM_RUNS} runs per problem with warmup\n\n")
+    write("**Measured workload:** each run scores all file pairs through `score_pairs` ")
+    write("(src/detectors/pairwise.py), the same path the app uses. Every distinct file is ")
+    write("prepared once per detector, pairs of identical files are scored once, token ")
+    write("similarity is computed for all pairs in one batch, and AST/Hash comparisons are ")
+    write("spread over a process pool. Time per comparison and per 1000 LOC are therefore ")
+    write("amortized over that batch, not the cost of comparing one pair in isolation.\n\n")
+
+    # Executive Summary
+    write("## Executive Summary\n\n")
+    write(f"This report presents performance benchmarking results for CodeGuard's plagiarism detection system across {len(all_results)} test problems ")
+    write(f"comprising {total_files} files ({total_lines:,} total lines of code, {total_comparisons:,} pairwise comparisons).\n\n")
+
+    write("**Key Findings:**\n\n")
+    write(f"- **Total processing time:** {total_time:.2f} seconds for all {len(all_results)} problems\n")
+    write(f"- **Fastest problem:** {fastest['problem_name']} at {fastest['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
+    write(f"- **Slowest problem:** {slowest['problem_name']} at {slowest['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
+    write(f"- **Average throughput:** {avg_throughput:.1f} lines/second\n")
+    write(f"- **Peak memory usage:** {max_memory:.2f} MB\n\n")
+
+    # Performance Metrics Table
+    write("## Performance Metrics\n\n")
+    write("| Problem | Files | Lines | Comparisons | Total Time (s) | Time/Comp (s) | Time/1000 LOC (s) | Lines/Sec | Memory (MB) | Preset |\n")
+    write("|---------|-------|-------|-------------|----------------|---------------|-------------------|-----------|-------------|--------|\n")
+
+    # One formatted string per row, written as a single block
+    write(''.join(PERF_ROW.format_map(result) for result in all_results))
+
+    write("\n")
+
+    # Detailed Analysis
+    write("## Detailed Analysis\n\n")
+
+    write("### Processing Speed by Problem Size\n\n")
+    write("The benchmark results show clear trends in processing speed relative to code volume:\n\n")
+
+    for result in all_results:
+        avg_lines_per_file = result['total_lines'] / result['total_files']
+        write(f"**{result['problem_name']}** ({result['total_lines']} lines, avg {avg_lines_per_file:.0f} lines/file):\n")
+        write(f"- Total time: {result['avg_total_time_sec']:.2f}s (range: {result['min_total_time_sec']:.2f}s - {result['max_total_time_sec']:.2f}s)\n")
+        write(f"- CPU time: {result['avg_cpu_time_sec']:.2f}s\n")
+        write(f"- Normalized: {result['avg_time_per_1000_loc_sec']:.4f}s per 1000 LOC\n")
+        write(f"- Throughput: {result['avg_lines_per_sec']:.1f} lines/second\n")
+        write(f"- Preset used: {result['preset']}\n\n")
+
+    # Comparison
+    write("### Fastest vs Slowest Problem\n\n")
+    write(f"**Fastest:** {fastest['problem_name']} processed at {fastest['avg_lines_per_sec']:.1f} lines/sec\n\n")
+    write(f"**Slowest:** {slowest['problem_name']} processed at {slowest['avg_lines_per_sec']:.1f} lines/sec\n\n")
+
+    speedup = slowest['avg_time_per_1000_loc_sec'] / fastest['avg_time_per_1000_loc_sec']
+    write(f"**Performance ratio:** {speedup:.2f}x (slowest vs fastest)\n\n")
+
+    # Bottleneck Analysis
+    write("### Bottleneck Analysis\n\n")
+    write("Based on the CodeGuard architecture (Token, AST, Hash detectors with VotingSystem):\n\n")
+    write("**Expected detector performance (from CLAUDE.md):**\n")
+    write("- Token Detector: Target 5000 lines/second\n")
+    write("- AST Detector: Target 1000 lines/second (most expensive)\n")
+    write("- Hash Detector: Target 3000 lines/second\n\n")
+
+    write(f"**Observed average throughput:** {avg_throughput:.1f} lines/second\n\n")
+
+    write("**Analysis:**\n")
+    write("- The observed throughput suggests the **AST detector is the primary bottleneck**, ")
+    write("as expected from the architecture documentation.\n")
+    write("- AST parsing and structural comparison are computationally expensive operations.\n")
+    write("- The Token and Hash detectors are likely running significantly faster.\n")
+    write("- Voting system overhead is minimal (simple weighted aggregation).\n")
+    write("- Observed throughput includes the deduplication and batching described under ")
+    write("*Measured workload*, so it is not directly comparable to the per-pair targets above.\n\n")
+
+    # Memory Usage
+    write("### Memory Usage\n\n")
+    write(f"**Peak memory usage:** {max_memory:.2f} MB ({max_memory_result['problem_name']})\n")
+    write(f"**Minimum memory usage:** {min_memory:.2f} MB ({min_memory_result['problem_name']})\n\n")
+    write("Memory usage is well within acceptable limits for a classroom tool. ")
+    write("The system handles all test problems comfortably with less than 100 MB peak memory.\n\n")
+
+    # Line Count Impact
+    write("### Line Count Impact on Processing Speed\n\n")
+    write("The relationship between code volume and processing time:\n\n")
+
+    # Calculate correlation
+    write("| Problem | Total Lines | Time/1000 LOC (s) | Efficiency Ratio |\n")
+    write("|---------|-------------|-------------------|------------------|\n")
+
+    baseline_time = all_results[0]['avg_time_per_1000_loc_sec']
+    write(''.join(
+        EFFICIENCY_ROW.format(
+            efficiency=baseline_time / result['avg_time_per_1000_loc_sec'], **result
+        )
+        for result in all_results
+    ))
+
+    write("\n")
+    write("**Observations:**\n")
+    write("- Processing time scales roughly linearly with code volume (as expected for O(n²) pairwise comparisons)\n")
+    write("- Smaller files may benefit from better cache locality\n")
+    write("- Larger files may incur additional AST parsing overhead\n\n")
+
+    # Recommendations
+    write("## Optimization Recommendations\n\n")
+    write("### High Priority\n\n")
+    write("1. **Optimize AST Detector:**\n")
+    write("   - Cache parsed AST trees to avoid re-parsing the same file\n")
+    write("   - Consider parallel AST comparison for independent file pairs\n")
+    write("   - Profile AST normalization and tree traversal for optimization opportunities\n\n")
+
+    write("2. **Implement Result Caching:**\n")
+    write("   - Cache pairwise comparison results to avoid redundant computation\n")
+    write("   - Use file content hash as cache key\n")
+    write("   - Potential speedup: 2-10x for repeated analyses\n\n")
+
+    write("3. **Parallelize Detector Execution:**\n")
+    write("   - Run Token, AST, and Hash detectors in parallel using threading or multiprocessing\n")
+    write("   - Current implementation runs detectors sequentially\n")
+    write("   - Estimated speedup: 1.5-2x (limited by AST detector as bottleneck)\n\n")
+
+    write("### Medium Priority\n\n")
+    write("4. **Batch Processing Optimization:**\n")
+    write("   - Process file pairs in batches with multiprocessing pool\n")
+    write("   - Distribute work across CPU cores\n")
+    write("   - Potential speedup: 2-4x on multi-core systems\n\n")
+
+    write("5. **Early Termination Strategy:**\n")
+    write("   - If Token detector shows very low similarity (<0.3), skip expensive AST analysis\n")
+    write("   - Implement adaptive thresholding based on initial results\n")
+    write("   - Reduces unnecessary computation on clearly non-plagiarized pairs\n\n")
+
+    write("### Low Priority\n\n")
+    write("6. **Memory Optimization:**\n")
+    write("   - Current memory usage is acceptable (<100 MB peak)\n")
+    write("   - Consider streaming large files instead of loading all into memory\n")
+    write("   - Implement garbage collection hints after batch processing\n\n")
+
+    # Overall Assessment
+    write("## Overall Assessment: Classroom Suitability\n\n")
+
+    write("**Current Performance:**\n")
+    write(f"- 20-file assignment: ~{total_time / len(all_results):.1f} seconds average\n")
+    write(f"- 50-file assignment: ~{(50/20)**2 * total_time / len(all_results):.1f} seconds (estimated)\n")
+    write(f"- 100-file assignment: ~{(100/20)**2 * total_time / len(all_results) / 60:.1f} minutes (estimated)\n\n")
+
+    # Split the small-file problem from the medium ones in a single pass
+    fizzbuzz_times: List[float] = []
+    medium_times: List[float] = []
+    for r in all_results:
+        if r['problem_name'] == 'FizzBuzzProblem':
+            fizzbuzz_times.append(r['avg_total_time_sec'])
+        else:
+            medium_times.append(r['avg_total_time_sec'])
+
+    write("**Verdict:** ✅ **ACCEPTABLE for classroom use**\n\n")
+    write("**Justification:**\n")
+    write("- Processing times are reasonable for typical classroom assignments (20-50 files)\n")
+    write("- Sub-minute analysis for small assignments (FizzBuzz: ~{:.1f}s)\n".format(
+        fizzbuzz_times[0]
+    ))
+    write("- 1-2 minute analysis for medium assignments (RPS, A*: ~{:.1f}s average)\n".format(
+        sum(medium_times) / len(medium_times)
+    ))
+    write("- Memory footprint is minimal (<100 MB)\n")
+    write("- System is stable and handles all test cases successfully\n\n")
+
+    write("**Recommendations for Production Deployment:**\n")
+    write("- Implement AST caching for 2-3x speedup on repeated analyses\n")
+    write("- Add progress indicators for assignments with >30 files\n")
+    write("- Consider async processing with job queue for large batches (100+ files)\n")
+    write("- Set timeout limits (e.g., 10 minutes) for very large assignments\n\n")
+
+    # Appendix
+    write("## Appendix: Raw Data\n\n")
+    write("Detailed CSV files with individual run results are available in:\n")
+    write(f"- `{output_dir.relative_to(output_dir.parent.parent)}/`\n\n")
+
+    write("**Files generated:**\n")
+    for result in all_results:
+        write(f"- `{result['problem_name']}_benchmark.csv`\n")
+
+    write("\n---\n\n")
+    write("*This report was automatically generated by scripts/performance_benchmark.py*\n")
+
+    # Encode once and write the bytes directly; the report is always UTF-8
+    report_path.write_bytes(''.join(parts).encode('utf-8'))
 
     logger.info(f"Generated performance report: {report_path}")
 
@@ -642,6 +791,9 @@ def main():
             logger.error(traceback.format_exc())
             continue
 
+    # Sort once by total lines; the report and the summary share this order
+    all_results.sort(key=lambda x: x['total_lines'])
+
     # Generate performance report
     if all_results:
         print("\n" + "="*70)
@@ -665,7 +817,7 @@ def main():
     print("SUMMARY")
     print("="*70)
 
-    for result in sorted(all_results, key=lambda x: x['total_lines']):
+    for result in all_results:
         print(f"\n{result['problem_name']}:")
         print(f"  Files: {result['total_files']}, Lines: {result['total_lines']:,}, Comparisons: {result['total_comparisons']}")
         print(f"  Avg time: {result['avg_total_time_sec']:.2f}s")
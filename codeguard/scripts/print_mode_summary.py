@@ -7,25 +7,39 @@ Prints a concise summary of mode comparison results to terminal.
 
 import csv
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+
+# Converters for the numeric metric columns; other columns stay strings
+NUMERIC_COLUMNS = {
+    'tp': int,
+    'fp': int,
+    'tn': int,
+    'fn': int,
+    'precision': float,
+    'recall': float,
+    'f1': float,
+    'accuracy': float,
+}
+
+# Problem-by-problem breakdown line: problem, mode, F1/precision/recall in %, FP, FN
+BREAKDOWN_ROW = "{:<25} {:<10} {:>6.2f}%   {:>6.2f}%      {:>6.2f}%    {:<6} {:<6}"
 
 
 def load_metrics(csv_path: Path) -> List[Dict]:
     """Load metrics from CSV file"""
     metrics = []
     with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        # Resolve each column's converter once from the header
+        converters = [NUMERIC_COLUMNS.get(name, str) for name in header]
         for row in reader:
-            # Convert numeric fields
-            row['tp'] = int(row['tp'])
-            row['fp'] = int(row['fp'])
-            row['tn'] = int(row['tn'])
-            row['fn'] = int(row['fn'])
-            row['precision'] = float(row['precision'])
-            row['recall'] = float(row['recall'])
-            row['f1'] = float(row['f1'])
-            row['accuracy'] = float(row['accuracy'])
-            metrics.append(row)
+            if row:
+                metrics.append({
+                    name: convert(value)
+                    for name, convert, value in zip(header, converters, row)
+                })
     return metrics
 
 
@@ -35,9 +49,16 @@ def print_summary(metrics: List[Dict]):
     print("CodeGuard Mode Effectiveness Comparison - Quick Summary")
     print("="*80)
 
+    # Index the rows once: by mode for the averages, by (problem, mode) for lookups
+    by_mode: Dict[str, List[Dict]] = {'SIMPLE': [], 'STANDARD': []}
+    by_problem_mode: Dict[Tuple[str, str], Dict] = {}
+    for m in metrics:
+        by_mode.setdefault(m['mode'], []).append(m)
+        by_problem_mode.setdefault((m['problem'], m['mode']), m)
+
     # Calculate overall averages
-    simple_metrics = [m for m in metrics if m['mode'] == 'SIMPLE']
-    standard_metrics = [m for m in metrics if m['mode'] == 'STANDARD']
+    simple_metrics = by_mode['SIMPLE']
+    standard_metrics = by_mode['STANDARD']
 
     simple_avg_f1 = sum(m['f1'] for m in simple_metrics) / len(simple_metrics)
     standard_avg_f1 = sum(m['f1'] for m in standard_metrics) / len(standard_metrics)
@@ -68,31 +89,33 @@ def print_summary(metrics: List[Dict]):
     problems = ['FizzBuzzProblem', 'RockPaperScissors', 'astar_pathfinding', 'inventory_ice_cream_shop']
     for problem in problems:
         for mode in ['SIMPLE', 'STANDARD']:
-            m = next((metric for metric in metrics if metric['problem'] == problem and metric['mode'] == mode), None)
+            m = by_problem_mode.get((problem, mode))
             if m:
-                print(f"{problem:<25} {mode:<10} {m['f1']*100:>6.2f}%   {m['precision']*100:>6.2f}%      {m['recall']*100:>6.2f}%    {m['fp']:<6} {m['fn']:<6}")
+                print(BREAKDOWN_ROW.format(
+                    problem, mode, m['f1'] * 100, m['precision'] * 100, m['recall'] * 100, m['fp'], m['fn']
+                ))
 
     print("\n*** KEY FINDINGS ***")
     print("\n1. SIMPLE mode WINS on small files (<50 lines):")
-    fizz_simple = next(m for m in metrics if m['problem'] == 'FizzBuzzProblem' and m['mode'] == 'SIMPLE')
-    fizz_standard = next(m for m in metrics if m['problem'] == 'FizzBuzzProblem' and m['mode'] == 'STANDARD')
+    fizz_simple = by_problem_mode['FizzBuzzProblem', 'SIMPLE']
+    fizz_standard = by_problem_mode['FizzBuzzProblem', 'STANDARD']
     print(f"   - FizzBuzz F1: SIMPLE {fizz_simple['f1']*100:.2f}% vs STANDARD {fizz_standard['f1']*100:.2f}%")
     print(f"   - Margin: {(fizz_simple['f1'] - fizz_standard['f1']) / fizz_standard['f1'] * 100:.1f}% improvement")
     print(f"   - False Positives: SIMPLE {fizz_simple['fp']} vs STANDARD {fizz_standard['fp']}")
     print(f"   - FP Reduction: {(fizz_standard['fp'] - fizz_simple['fp']) / fizz_standard['fp'] * 100:.1f}%")
 
     print("\n2. STANDARD mode WINS on medium files (50-150 lines):")
-    rps_simple = next(m for m in metrics if m['problem'] == 'RockPaperScissors' and m['mode'] == 'SIMPLE')
-    rps_standard = next(m for m in metrics if m['problem'] == 'RockPaperScissors' and m['mode'] == 'STANDARD')
+    rps_simple = by_problem_mode['RockPaperScissors', 'SIMPLE']
+    rps_standard = by_problem_mode['RockPaperScissors', 'STANDARD']
     print(f"   - RockPaperScissors F1: STANDARD {rps_standard['f1']*100:.2f}% vs SIMPLE {rps_simple['f1']*100:.2f}%")
     print(f"   - Margin: {(rps_standard['f1'] - rps_simple['f1']) / rps_simple['f1'] * 100:.1f}% improvement")
     print(f"   - Recall: STANDARD {rps_standard['recall']*100:.1f}% vs SIMPLE {rps_simple['recall']*100:.1f}%")
 
     print("\n3. Modes CONVERGE on complex files (>130 lines):")
-    astar_simple = next(m for m in metrics if m['problem'] == 'astar_pathfinding' and m['mode'] == 'SIMPLE')
-    astar_standard = next(m for m in metrics if m['problem'] == 'astar_pathfinding' and m['mode'] == 'STANDARD')
-    inventory_simple = next(m for m in metrics if m['problem'] == 'inventory_ice_cream_shop' and m['mode'] == 'SIMPLE')
-    inventory_standard = next(m for m in metrics if m['problem'] == 'inventory_ice_cream_shop' and m['mode'] == 'STANDARD')
+    astar_simple = by_problem_mode['astar_pathfinding', 'SIMPLE']
+    astar_standard = by_problem_mode['astar_pathfinding', 'STANDARD']
+    inventory_simple = by_problem_mode['inventory_ice_cream_shop', 'SIMPLE']
+    inventory_standard = by_problem_mode['inventory_ice_cream_shop', 'STANDARD']
     print(f"   - astar F1: SIMPLE {astar_simple['f1']*100:.2f}% vs STANDARD {astar_standard['f1']*100:.2f}% (IDENTICAL)")
     print(f"   - inventory F1: SIMPLE {inventory_simple['f1']*100:.2f}% vs STANDARD {inventory_standard['f1']*100:.2f}% (IDENTICAL)")
 
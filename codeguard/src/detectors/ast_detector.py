@@ -21,7 +21,7 @@ Author: CodeGuard Team
 
 import ast
 from pathlib import Path
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 
 class ASTDetector:
@@ -142,7 +142,7 @@ class ASTDetector:
             # Handle other parsing errors gracefully
             return None
 
-    def _normalize_ast(self, tree: ast.AST) -> ast.AST:
+    def _normalize_ast(self, tree: ast.AST, in_place: bool = False) -> ast.AST:
         """
         Normalize an AST by removing variable and function names.
 
@@ -160,9 +160,13 @@ class ASTDetector:
 
         Args:
             tree: The AST to normalize.
+            in_place: Normalize tree itself instead of a deep copy. Copying
+                dominates normalization time, so callers that discard the
+                original tree should pass True.
 
         Returns:
-            ast.AST: A normalized copy of the AST with identifiers removed.
+            ast.AST: A normalized copy of the AST (or tree itself when
+                in_place is True) with identifiers removed.
 
         Example:
             Original: def calc(x, y): return x + y
@@ -236,10 +240,10 @@ class ASTDetector:
                 self.generic_visit(node)
                 return node
 
-        # Create a deep copy and normalize it
+        # Create a deep copy (unless normalizing in place) and normalize it
         import copy
 
-        normalized_tree = copy.deepcopy(tree)
+        normalized_tree = tree if in_place else copy.deepcopy(tree)
         transformer = NormalizingTransformer()
         normalized_tree = transformer.visit(normalized_tree)
 
@@ -389,9 +393,15 @@ class ASTDetector:
         """
         Calculate the length of the Longest Common Subsequence.
 
-        This is a classic dynamic programming algorithm used to find the
-        longest sequence of elements that appear in both sequences in the
-        same relative order (but not necessarily consecutively).
+        Finds the length of the longest sequence of elements that appear in
+        both sequences in the same relative order (but not necessarily
+        consecutively).
+
+        Instead of filling the classic O(m × n) dynamic programming table cell
+        by cell, this uses the bit-parallel formulation (Hyyrö, 2004): one
+        row of the DP table is encoded as the bits of a Python integer, and
+        each element of the other sequence updates the whole row with a few
+        big-integer operations. The result is identical to the DP table.
 
         Args:
             seq1: First sequence.
@@ -400,29 +410,49 @@ class ASTDetector:
         Returns:
             int: Length of the longest common subsequence.
 
-        Time Complexity: O(m × n) where m, n are sequence lengths
-        Space Complexity: O(m × n)
-
-        Note:
-            For performance on large files, this could be optimized to O(n)
-            space by keeping only two rows of the DP table.
+        Time Complexity: O(m × n / w) where w is the machine word size
+        Space Complexity: O(m × σ / w) bits for σ distinct elements
         """
         m, n = len(seq1), len(seq2)
 
-        # Create DP table - dp[i][j] stores LCS length of seq1[0:i] and seq2[0:j]
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-
-        # Fill the DP table
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if seq1[i - 1] == seq2[j - 1]:
-                    # Characters match - extend LCS
-                    dp[i][j] = dp[i - 1][j - 1] + 1
-                else:
-                    # Characters don't match - take max from previous states
-                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-
-        return dp[m][n]
+        # A common prefix and suffix are always part of an LCS, so trim them
+        # before building the table. Identical signatures (e.g. a copy that
+        # only differs in comments or names) need no table at all.
+        limit = min(m, n)
+        prefix = 0
+        while prefix < limit and seq1[prefix] == seq2[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and seq1[m - 1 - suffix] == seq2[n - 1 - suffix]:
+            suffix += 1
+
+        common = prefix + suffix
+        if common == limit:
+            return common
+        if common:
+            seq1 = seq1[prefix : m - suffix]
+            seq2 = seq2[prefix : n - suffix]
+            m, n = len(seq1), len(seq2)
+
+        # Keep the longer sequence in the bit vector so the Python-level loop
+        # runs over the shorter one
+        if m < n:
+            seq1, seq2 = seq2, seq1
+            m, n = n, m
+
+        # match_masks[x] has bit i set where seq1[i] == x
+        match_masks: Dict[str, int] = {}
+        for i, item in enumerate(seq1):
+            match_masks[item] = match_masks.get(item, 0) | (1 << i)
+
+        # Zero bits of row mark the positions of seq1 matched so far
+        all_ones = (1 << m) - 1
+        row = all_ones
+        for item in seq2:
+            matches = row & match_masks.get(item, 0)
+            row = ((row + matches) | (row - matches)) & all_ones
+
+        return common + m - row.bit_count()
 
     def _compare_trees(self, tree1: ast.AST, tree2: ast.AST) -> float:
         """
@@ -447,16 +477,37 @@ class ASTDetector:
             - Apply size penalty for significantly different tree sizes
             - Combine with weighted average
         """
-        # Extract structural signatures
+        # Extract structural signatures and node type counts
         sig1 = self._extract_structure_signature(tree1)
         sig2 = self._extract_structure_signature(tree2)
+        counts1 = self._count_node_types(tree1)
+        counts2 = self._count_node_types(tree2)
+
+        return self._compare_structures(sig1, counts1, sig2, counts2)
+
+    def _compare_structures(
+        self,
+        sig1: List[str],
+        counts1: Dict[str, int],
+        sig2: List[str],
+        counts2: Dict[str, int],
+    ) -> float:
+        """
+        Combine structural, frequency and size similarity of two trees.
 
+        Args:
+            sig1: Structure signature of the first tree.
+            counts1: Node type counts of the first tree.
+            sig2: Structure signature of the second tree.
+            counts2: Node type counts of the second tree.
+
+        Returns:
+            float: Similarity score between 0.0 and 1.0 (see _compare_trees).
+        """
         # Calculate primary similarity metric (structural sequence similarity)
         structural_similarity = self._calculate_structure_similarity(sig1, sig2)
 
         # Calculate node type frequency similarity as secondary metric
-        counts1 = self._count_node_types(tree1)
-        counts2 = self._count_node_types(tree2)
         frequency_similarity = self._calculate_frequency_similarity(counts1, counts2)
 
         # Calculate size ratio penalty
@@ -638,17 +689,54 @@ class ASTDetector:
             >>> similarity = detector.compare(code1, code2)
             >>> print(f"Structural similarity: {similarity:.2%}")
         """
-        # Parse both source strings
-        tree1 = self._parse_ast(source1)
-        tree2 = self._parse_ast(source2)
+        return self.compare_prepared(self.prepare(source1), self.prepare(source2))
+
+    def prepare(self, source: str) -> Optional[Tuple[List[str], Dict[str, int]]]:
+        """
+        Preprocess a source string into the features used by compare_prepared().
 
+        When one file takes part in many comparisons, preparing it once and
+        reusing the result avoids re-parsing and re-normalizing its AST for
+        every pair.
+
+        Args:
+            source: Python source code string.
+
+        Returns:
+            Optional[Tuple[List[str], Dict[str, int]]]: Structure signature
+                and node type counts of the normalized AST, or None if the
+                source cannot be parsed.
+        """
+        tree = self._parse_ast(source)
+        if tree is None:
+            return None
+
+        # The freshly parsed tree is not used again, so skip the copy
+        normalized = self._normalize_ast(tree, in_place=True)
+        return self._extract_structure_signature(normalized), self._count_node_types(normalized)
+
+    def compare_prepared(
+        self,
+        prepared1: Optional[Tuple[List[str], Dict[str, int]]],
+        prepared2: Optional[Tuple[List[str], Dict[str, int]]],
+    ) -> float:
+        """
+        Compare two sources already preprocessed with prepare().
+
+        compare_prepared(prepare(a), prepare(b)) == compare(a, b).
+
+        Args:
+            prepared1: Prepared features of the first source.
+            prepared2: Prepared features of the second source.
+
+        Returns:
+            float: Structural similarity score between 0.0 and 1.0.
+                  Returns 0.0 if either source could not be parsed.
+        """
         # Handle parsing failures
-        if tree1 is None or tree2 is None:
+        if prepared1 is None or prepared2 is None:
             return 0.0
 
-        # Normalize ASTs
-        normalized1 = self._normalize_ast(tree1)
-        normalized2 = self._normalize_ast(tree2)
-
-        # Compare and return similarity
-        return self._compare_trees(normalized1, normalized2)
+        sig1, counts1 = prepared1
+        sig2, counts2 = prepared2
+        return self._compare_structures(sig1, counts1, sig2, counts2)
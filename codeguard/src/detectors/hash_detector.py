@@ -337,18 +337,17 @@ class HashDetector:
         if not fp1 or not fp2:
             return 0.0
 
-        # Calculate intersection (common fingerprints)
-        intersection = fp1 & fp2
-
-        # Calculate union (all unique fingerprints)
-        union = fp1 | fp2
+        # Calculate intersection size (common fingerprints); the union size
+        # follows from it without building the union set
+        intersection_size = len(fp1 & fp2)
+        union_size = len(fp1) + len(fp2) - intersection_size
 
         # Handle edge case: empty union (shouldn't happen, but be defensive)
-        if len(union) == 0:
+        if union_size == 0:
             return 0.0
 
         # Calculate Jaccard similarity
-        jaccard_similarity = len(intersection) / len(union)
+        jaccard_similarity = intersection_size / union_size
 
         return jaccard_similarity
 
@@ -458,21 +457,55 @@ class HashDetector:
         Note:
             This method uses the k and w parameters set during initialization.
         """
-        # Tokenize both source strings
-        tokens1 = self._tokenize(source1)
-        tokens2 = self._tokenize(source2)
+        return self.compare_prepared(self.prepare(source1), self.prepare(source2))
 
-        # Generate k-grams
-        kgrams1 = self._generate_kgrams(tokens1, self.k)
-        kgrams2 = self._generate_kgrams(tokens2, self.k)
+    def prepare(self, source: str) -> Set[int]:
+        """
+        Preprocess a source string into the features used by compare_prepared().
 
-        # Hash k-grams
-        hashes1 = self._hash_kgrams(kgrams1)
-        hashes2 = self._hash_kgrams(kgrams2)
+        When one file takes part in many comparisons, preparing it once and
+        reusing the result avoids re-tokenizing, re-hashing and re-winnowing
+        it for every pair.
 
-        # Apply winnowing to select fingerprints
-        fingerprints1 = self._winnow(hashes1, self.w)
-        fingerprints2 = self._winnow(hashes2, self.w)
+        Args:
+            source: Python source code string.
+
+        Returns:
+            Set[int]: Winnowed fingerprints of the source, using this
+                      detector's k and w.
+        """
+        return self.prepare_tokens(self._tokenize(source))
 
-        # Compare fingerprints and return similarity
+    def prepare_tokens(self, tokens: List[str]) -> Set[int]:
+        """
+        Build the features used by compare_prepared() from tokens already
+        extracted with _tokenize().
+
+        TokenDetector tokenizes with the same semantic token types, so a
+        caller preparing a file for both detectors can tokenize it once and
+        hand the tokens to both (see TokenDetector.prepare_tokens).
+
+        Args:
+            tokens: Semantic tokens of the source, as returned by _tokenize().
+
+        Returns:
+            Set[int]: Winnowed fingerprints, equal to prepare(source).
+        """
+        kgrams = self._generate_kgrams(tokens, self.k)
+        hashes = self._hash_kgrams(kgrams)
+        return self._winnow(hashes, self.w)
+
+    def compare_prepared(self, fingerprints1: Set[int], fingerprints2: Set[int]) -> float:
+        """
+        Compare two sources already preprocessed with prepare().
+
+        compare_prepared(prepare(a), prepare(b)) == compare(a, b).
+
+        Args:
+            fingerprints1: Prepared features of the first source.
+            fingerprints2: Prepared features of the second source.
+
+        Returns:
+            float: Fingerprint similarity score between 0.0 and 1.0.
+        """
         return self._compare_fingerprints(fingerprints1, fingerprints2)
@@ -0,0 +1,298 @@
+"""
+Pairwise scoring of a set of source files with all three detectors.
+
+The Streamlit app compares every pair of uploaded files. Each pair runs the
+Token, AST and (optionally) Hash detectors, which are independent and CPU
+bound, so the pairs are spread over a pool of worker processes. Each worker
+builds its detectors and receives the source files once, in the pool
+initializer; after that a task is just a pair of file indices.
+
+Every file takes part in N-1 pairs, so each worker parses and fingerprints
+a file the first time it sees it (detector.prepare) and reuses those
+features for the rest of its pairs (detector.compare_prepared). The feature
+cache belongs to one score_pairs() call, so nothing is shared between calls
+or kept after one finishes.
+
+Token similarity is cheap enough to compute for all pairs at once in the
+calling process: the files' token counts form a sparse file x token matrix,
+and the shared-token counts and dot products of every pair (X * X^T) are
+accumulated from an inverted index, touching only tokens two files share.
+
+Byte-identical submissions are common in class sets. Every distinct source
+is prepared once, and pairs that compare the same two distinct sources are
+scored once and the result is shared.
+
+Detector errors are caught per detector and reported back with the scores,
+so one unparsable file never aborts the whole batch. If the process pool
+itself fails (a worker dies, or cannot be started), the pairs it did not
+score are scored in the calling process instead.
+
+Author: CodeGuard Team
+"""
+
+import logging
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .token_detector import TokenDetector
+from .ast_detector import ASTDetector
+from .hash_detector import HashDetector
+
+logger = logging.getLogger(__name__)
+
+# Below this many pairs, starting worker processes costs more than it saves
+PARALLEL_MIN_PAIRS = 20
+
+class _PairScorer:
+    """
+    AST and hash scoring of pairs drawn from one batch of sources.
+
+    Holds the detectors and each source's prepared features for a single
+    score_pairs() call, so concurrent calls (Streamlit sessions are threads
+    of one process) never see each other's sources or features, and both
+    are released when the call finishes.
+    """
+
+    def __init__(self, sources: Sequence[str], hash_k: int, hash_w: int, hash_active: bool):
+        self.sources = sources
+        self.ast_detector = ASTDetector()
+        self.hash_detector = HashDetector(k=hash_k, w=hash_w) if hash_active else None
+        # Prepared features keyed by (detector name, source index)
+        self.features: Dict[Tuple[str, int], Any] = {}
+
+    def prepared(self, name: str, detector: Any, index: int) -> Any:
+        """Return a source's features for one detector, preparing them on first use."""
+        key = (name, index)
+        if key not in self.features:
+            self.features[key] = detector.prepare(self.sources[index])
+        return self.features[key]
+
+    def score(self, pair: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        Score one pair of sources (by index) with the AST and hash detectors.
+
+        Returns:
+            Dict with 'ast' and 'hash' scores and an 'errors' dict mapping
+            detector name to error message. A detector that failed, or the
+            hash detector when inactive, scores 0.0.
+        """
+        index1, index2 = pair
+        scores: Dict[str, Any] = {"ast": 0.0, "hash": 0.0, "errors": {}}
+
+        try:
+            scores["ast"] = self.ast_detector.compare_prepared(
+                self.prepared("ast", self.ast_detector, index1),
+                self.prepared("ast", self.ast_detector, index2),
+            )
+        except Exception as e:
+            scores["errors"]["ast"] = str(e)
+
+        if self.hash_detector is not None:
+            try:
+                scores["hash"] = self.hash_detector.compare_prepared(
+                    self.prepared("hash", self.hash_detector, index1),
+                    self.prepared("hash", self.hash_detector, index2),
+                )
+            except Exception as e:
+                scores["errors"]["hash"] = str(e)
+
+        return scores
+
+
+# Scorer of a pool worker process, set up by _init_worker. Only used inside
+# workers, which serve a single score_pairs() call each.
+_worker_scorer: Optional[_PairScorer] = None
+
+
+def _init_worker(sources: Sequence[str], hash_k: int, hash_w: int, hash_active: bool) -> None:
+    """Build this worker's scorer for the sources to be compared."""
+    global _worker_scorer
+    _worker_scorer = _PairScorer(sources, hash_k, hash_w, hash_active)
+
+
+def _score_pair(pair: Tuple[int, int]) -> Dict[str, Any]:
+    """Score one pair in a pool worker (see _PairScorer.score)."""
+    return _worker_scorer.score(pair)
+
+
+def _token_similarities(
+    sources: Sequence[str], pairs: List[Tuple[int, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Token Jaccard and cosine similarity of every pair, computed in one batch.
+
+    Gives exactly the same values as TokenDetector's
+    _calculate_jaccard_similarity and _calculate_cosine_similarity: both
+    are ratios of integer counts, which are accumulated here per token
+    rather than per pair.
+
+    Returns:
+        One dict per pair with 'token_jaccard', 'token_cosine' and 'errors'
+    """
+    detector = TokenDetector()
+
+    # Token counts (a row of the file x token matrix) for every source
+    counts: List[Optional[Counter]] = []
+    errors: Dict[int, str] = {}
+    for index, source in enumerate(sources):
+        try:
+            counts.append(Counter(detector.prepare(source)))
+        except Exception as e:
+            counts.append(None)
+            errors[index] = str(e)
+
+    # Inverted index: token -> [(file index, count)], in file order
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for index, freq in enumerate(counts):
+        if freq is not None:
+            for token, count in freq.items():
+                postings.setdefault(token, []).append((index, count))
+
+    # Shared distinct tokens and dot product of every pair sharing a token
+    shared: Counter = Counter()
+    dot: Counter = Counter()
+    for posting in postings.values():
+        for position, (index1, count1) in enumerate(posting):
+            for index2, count2 in posting[position + 1:]:
+                shared[index1, index2] += 1
+                dot[index1, index2] += count1 * count2
+
+    magnitudes = [
+        math.sqrt(sum(count * count for count in freq.values())) if freq is not None else 0.0
+        for freq in counts
+    ]
+
+    results = []
+    for index1, index2 in pairs:
+        scores: Dict[str, Any] = {"token_jaccard": 0.0, "token_cosine": 0.0, "errors": {}}
+        results.append(scores)
+
+        failed = errors.get(index1, errors.get(index2))
+        if failed is not None:
+            scores["errors"]["token"] = failed
+            continue
+
+        if index1 == index2:
+            # A source against itself shares every token with itself
+            pair_shared = len(counts[index1])
+            pair_dot = sum(count * count for count in counts[index1].values())
+        else:
+            key = (index1, index2) if index1 < index2 else (index2, index1)
+            pair_shared = shared[key]
+            pair_dot = dot[key]
+
+        union = len(counts[index1]) + len(counts[index2]) - pair_shared
+        if union:
+            scores["token_jaccard"] = pair_shared / union
+        if magnitudes[index1] and magnitudes[index2]:
+            scores["token_cosine"] = pair_dot / (magnitudes[index1] * magnitudes[index2])
+
+    return results
+
+
+def score_pairs(
+    sources: Sequence[str],
+    pairs: List[Tuple[int, int]],
+    hash_active: bool = True,
+    hash_k: int = 5,
+    hash_w: int = 4,
+    max_workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Score pairs of source files, yielding results in the order of pairs.
+
+    Small batches (fewer than PARALLEL_MIN_PAIRS pairs) or max_workers=1 are
+    scored in this process; larger ones on a ProcessPoolExecutor. Results
+    are yielded as soon as they are available, so callers can report
+    progress while the rest of the batch is still running.
+
+    Args:
+        sources: Source code of every file
+        pairs: (i, j) indices into sources to compare
+        hash_active: Run the hash detector (scored as 0.0 when False)
+        hash_k: K-gram size for the hash detector
+        hash_w: Winnowing window size for the hash detector
+        max_workers: Worker processes (default: os.cpu_count())
+
+    Yields:
+        One dict per pair with 'token_jaccard', 'token_cosine', 'ast' and
+        'hash' scores and an 'errors' dict mapping detector name to error
+        message. A detector that failed, or the hash detector when
+        inactive, scores 0.0.
+
+    Example:
+        >>> sources = [code_a, code_b, code_c]
+        >>> for scores in score_pairs(sources, [(0, 1), (0, 2), (1, 2)]):
+        ...     print(scores["ast"])
+    """
+    workers = max_workers or os.cpu_count() or 1
+
+    # Map every source to its first identical copy, so duplicates are
+    # prepared once and pairs of the same two distinct sources scored once
+    positions: Dict[str, int] = {}
+    distinct: List[str] = []
+    for source in sources:
+        if source not in positions:
+            positions[source] = len(distinct)
+            distinct.append(source)
+    slot = [positions[source] for source in sources]
+    keys = [(slot[index1], slot[index2]) for index1, index2 in pairs]
+    unique_pairs = list(dict.fromkeys(keys))
+
+    init_args = (distinct, hash_k, hash_w, hash_active)
+    unique_scores = zip(
+        unique_pairs,
+        _token_similarities(distinct, unique_pairs),
+        _score_pairs(unique_pairs, workers, init_args),
+    )
+
+    # Unique pairs are scored in order of first appearance, so each pair's
+    # result is ready by the time it is reached
+    scored: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for key in keys:
+        while key not in scored:
+            unique_key, token_scores, scores = next(unique_scores)
+            token_scores["errors"].update(scores.pop("errors"))
+            token_scores.update(scores)
+            scored[unique_key] = token_scores
+        result = scored[key]
+        yield {**result, "errors": dict(result["errors"])}
+
+
+def _score_pairs(
+    pairs: List[Tuple[int, int]], workers: int, init_args: Tuple
+) -> Iterator[Dict[str, Any]]:
+    """Score pairs with a _PairScorer, in-process or on a process pool."""
+    if workers <= 1 or len(pairs) < PARALLEL_MIN_PAIRS:
+        scorer = _PairScorer(*init_args)
+        for pair in pairs:
+            yield scorer.score(pair)
+        return
+
+    # Several pairs per task keeps the IPC overhead per pair small
+    workers = min(workers, len(pairs))
+    chunksize = max(1, len(pairs) // (workers * 4))
+
+    done = 0
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        ) as executor:
+            for scores in executor.map(_score_pair, pairs, chunksize=chunksize):
+                yield scores
+                done += 1
+        return
+    except Exception as e:
+        # A broken pool loses the pairs it had not returned yet; detector
+        # errors never get here, as _PairScorer.score catches those per detector
+        logger.error(
+            "Process pool failed after %d/%d pairs (%r); scoring the rest in-process",
+            done, len(pairs), e,
+        )
+
+    scorer = _PairScorer(*init_args)
+    for pair in pairs[done:]:
+        yield scorer.score(pair)
@@ -165,16 +165,17 @@ class TokenDetector:
         if len(set1) == 0 and len(set2) == 0:
             return 0.0
 
-        # Calculate intersection and union
-        intersection = set1.intersection(set2)
-        union = set1.union(set2)
+        # Calculate intersection size; the union size follows from it
+        # (|A ∪ B| = |A| + |B| - |A ∩ B|) without building the union set
+        intersection_size = len(set1 & set2)
+        union_size = len(set1) + len(set2) - intersection_size
 
         # Handle edge case: union is empty (shouldn't happen, but be safe)
-        if len(union) == 0:
+        if union_size == 0:
             return 0.0
 
         # Calculate Jaccard similarity
-        jaccard_similarity = len(intersection) / len(union)
+        jaccard_similarity = intersection_size / union_size
 
         return jaccard_similarity
 
@@ -205,15 +206,15 @@ class TokenDetector:
         freq1 = Counter(tokens1)
         freq2 = Counter(tokens2)
 
-        # Get all unique tokens from both files
-        all_tokens = set(freq1.keys()).union(set(freq2.keys()))
-
-        # Calculate dot product
-        dot_product = sum(freq1.get(token, 0) * freq2.get(token, 0) for token in all_tokens)
+        # Calculate dot product; only tokens present in both files
+        # contribute, so walk the smaller vector's shared keys
+        if len(freq2) < len(freq1):
+            freq1, freq2 = freq2, freq1
+        dot_product = sum(count * freq2[token] for token, count in freq1.items() if token in freq2)
 
         # Calculate magnitudes (L2 norm)
-        magnitude1 = math.sqrt(sum(count**2 for count in freq1.values()))
-        magnitude2 = math.sqrt(sum(count**2 for count in freq2.values()))
+        magnitude1 = math.sqrt(sum(count * count for count in freq1.values()))
+        magnitude2 = math.sqrt(sum(count * count for count in freq2.values()))
 
         # Handle edge case: zero magnitude
         if magnitude1 == 0.0 or magnitude2 == 0.0:
@@ -323,10 +324,54 @@ class TokenDetector:
             >>> similarity = detector.compare(code1, code2)
             >>> print(f"Similarity: {similarity:.2%}")
         """
-        # Tokenize both source strings
-        tokens1 = self._tokenize_code(source1)
-        tokens2 = self._tokenize_code(source2)
+        return self.compare_prepared(self.prepare(source1), self.prepare(source2))
+
+    def prepare(self, source: str) -> List[str]:
+        """
+        Preprocess a source string into the features used by compare_prepared().
+
+        When one file takes part in many comparisons, preparing it once and
+        reusing the result avoids re-tokenizing it for every pair.
+
+        Args:
+            source: Python source code string.
+
+        Returns:
+            List[str]: Semantic tokens of the source (see _tokenize_code).
+        """
+        return self._tokenize_code(source)
+
+    def prepare_tokens(self, tokens: List[str]) -> List[str]:
+        """
+        Build the features used by compare_prepared() from semantic tokens
+        that were already extracted with their original case, such as the
+        output of HashDetector._tokenize().
+
+        Both detectors keep the same token types, so a caller preparing a
+        file for both can tokenize it once; this applies the lowercase
+        normalization of _tokenize_code.
 
+        Args:
+            tokens: Semantic tokens of the source, case preserved.
+
+        Returns:
+            List[str]: Normalized tokens, equal to prepare(source).
+        """
+        return [token.lower() for token in tokens]
+
+    def compare_prepared(self, tokens1: List[str], tokens2: List[str]) -> float:
+        """
+        Compare two sources already preprocessed with prepare().
+
+        compare_prepared(prepare(a), prepare(b)) == compare(a, b).
+
+        Args:
+            tokens1: Prepared features of the first source.
+            tokens2: Prepared features of the second source.
+
+        Returns:
+            float: Combined similarity score between 0.0 and 1.0.
+        """
         # Calculate both similarity metrics
         jaccard_sim = self._calculate_jaccard_similarity(tokens1, tokens2)
         cosine_sim = self._calculate_cosine_similarity(tokens1, tokens2)
@@ -300,58 +300,46 @@ class VotingSystem:
         self._validate_similarity_score(ast_sim, "AST")
         self._validate_similarity_score(hash_sim, "Hash")
 
-        # Map scores to detector names
-        scores = {"token": token_sim, "ast": ast_sim, "hash": hash_sim}
+        # Read each detector's threshold and weight once per vote; they come
+        # from the live config, so in-place edits apply to the next vote
+        token_threshold = self.token_config['threshold']
+        ast_threshold = self.ast_config['threshold']
+        hash_threshold = self.hash_config['threshold']
+        token_weight = self.token_config['weight']
+        ast_weight = self.ast_config['weight']
+        hash_weight = self.hash_config['weight']
 
         # Determine individual detector votes
         votes = {}
         total_votes_cast = 0.0
 
         # Token detector vote
-        if token_sim >= self.token_config['threshold']:
-            votes['token'] = self.token_config['weight']
-            total_votes_cast += self.token_config['weight']
-            logger.debug(
-                f"Token voted YES (score={token_sim:.3f}, "
-                f"threshold={self.token_config['threshold']:.2f})"
-            )
+        if token_sim >= token_threshold:
+            votes['token'] = token_weight
+            total_votes_cast += token_weight
+            logger.debug("Token voted YES (score=%.3f, threshold=%.2f)", token_sim, token_threshold)
         else:
             votes['token'] = 0.0
-            logger.debug(
-                f"Token voted NO (score={token_sim:.3f}, "
-                f"threshold={self.token_config['threshold']:.2f})"
-            )
+            logger.debug("Token voted NO (score=%.3f, threshold=%.2f)", token_sim, token_threshold)
 
         # AST detector vote
-        if ast_sim >= self.ast_config['threshold']:
-            votes['ast'] = self.ast_config['weight']
-            total_votes_cast += self.ast_config['weight']
-            logger.debug(
-                f"AST voted YES (score={ast_sim:.3f}, "
-                f"threshold={self.ast_config['threshold']:.2f})"
-            )
+        if ast_sim >= ast_threshold:
+            votes['ast'] = ast_weight
+            total_votes_cast += ast_weight
+            logger.debug("AST voted YES (score=%.3f, threshold=%.2f)", ast_sim, ast_threshold)
         else:
             votes['ast'] = 0.0
-            logger.debug(
-                f"AST voted NO (score={ast_sim:.3f}, "
-                f"threshold={self.ast_config['threshold']:.2f})"
-            )
+            logger.debug("AST voted NO (score=%.3f, threshold=%.2f)", ast_sim, ast_threshold)
 
         # Hash detector vote (skip if disabled)
-        if self.hash_config['weight'] > 0.0:
-            if hash_sim >= self.hash_config['threshold']:
-                votes['hash'] = self.hash_config['weight']
-                total_votes_cast += self.hash_config['weight']
-                logger.debug(
-                    f"Hash voted YES (score={hash_sim:.3f}, "
-                    f"threshold={self.hash_config['threshold']:.2f})"
-                )
+        if hash_weight > 0.0:
+            if hash_sim >= hash_threshold:
+                votes['hash'] = hash_weight
+                total_votes_cast += hash_weight
+                logger.debug("Hash voted YES (score=%.3f, threshold=%.2f)", hash_sim, hash_threshold)
             else:
                 votes['hash'] = 0.0
-                logger.debug(
-                    f"Hash voted NO (score={hash_sim:.3f}, "
-                    f"threshold={self.hash_config['threshold']:.2f})"
-                )
+                logger.debug("Hash voted NO (score=%.3f, threshold=%.2f)", hash_sim, hash_threshold)
         else:
             votes['hash'] = 0.0
             logger.debug("Hash detector SKIPPED (disabled, weight=0.0)")
@@ -362,19 +350,22 @@ class VotingSystem:
         # Calculate confidence (only from active detectors)
         confidence_score = self._calculate_confidence(token_sim, ast_sim, hash_sim)
 
-        # Enhanced debug logging
+        # Enhanced debug logging (%-style arguments are only formatted when
+        # the record is emitted)
         logger.info("=" * 60)
         logger.info("VOTING DECISION:")
-        logger.info(f"  Token: score={token_sim:.3f}, threshold={self.token_config['threshold']:.2f}, "
-                   f"weight={self.token_config['weight']:.1f}, vote={votes['token']:.1f}")
-        logger.info(f"  AST:   score={ast_sim:.3f}, threshold={self.ast_config['threshold']:.2f}, "
-                   f"weight={self.ast_config['weight']:.1f}, vote={votes['ast']:.1f}")
-        logger.info(f"  Hash:  score={hash_sim:.3f}, threshold={self.hash_config['threshold']:.2f}, "
-                   f"weight={self.hash_config['weight']:.1f}, vote={votes['hash']:.1f}")
-        logger.info(f"  Total votes cast: {total_votes_cast:.2f} / {self.total_votes:.1f} possible")
-        logger.info(f"  Decision threshold: {self.decision_threshold:.2f} ({self.decision_threshold/self.total_votes*100:.0f}%)")
-        logger.info(f"  Required votes: {self.decision_threshold:.2f}")
-        logger.info(f"  RESULT: {'PLAGIARISM DETECTED' if is_plagiarized else 'CLEAR'} (confidence={confidence_score:.3f})")
+        logger.info("  Token: score=%.3f, threshold=%.2f, weight=%.1f, vote=%.1f",
+                    token_sim, token_threshold, token_weight, votes['token'])
+        logger.info("  AST:   score=%.3f, threshold=%.2f, weight=%.1f, vote=%.1f",
+                    ast_sim, ast_threshold, ast_weight, votes['ast'])
+        logger.info("  Hash:  score=%.3f, threshold=%.2f, weight=%.1f, vote=%.1f",
+                    hash_sim, hash_threshold, hash_weight, votes['hash'])
+        logger.info("  Total votes cast: %.2f / %.1f possible", total_votes_cast, self.total_votes)
+        logger.info("  Decision threshold: %.2f (%.0f%%)",
+                    self.decision_threshold, self.decision_threshold / self.total_votes * 100)
+        logger.info("  Required votes: %.2f", self.decision_threshold)
+        logger.info("  RESULT: %s (confidence=%.3f)",
+                    'PLAGIARISM DETECTED' if is_plagiarized else 'CLEAR', confidence_score)
         logger.info("=" * 60)
 
         # Construct result dictionary
@@ -415,44 +406,36 @@ class VotingSystem:
             >>> conf > 0.70
             True
         """
-        # Collect active detector scores and weights
-        active_scores = []
-        active_weights = []
-
-        # Token detector
-        if self.token_config['weight'] > 0.0:
-            active_scores.append(token_score)
-            active_weights.append(self.token_config['confidence_weight'])
-
-        # AST detector
-        if self.ast_config['weight'] > 0.0:
-            active_scores.append(ast_score)
-            active_weights.append(self.ast_config['confidence_weight'])
-
-        # Hash detector (may be disabled in simple preset)
-        if self.hash_config['weight'] > 0.0:
-            active_scores.append(hash_score)
-            active_weights.append(self.hash_config['confidence_weight'])
+        # Pair each active detector's score with its confidence weight
+        active = tuple(
+            (score, detector_config['confidence_weight'])
+            for score, detector_config in (
+                (token_score, self.token_config),
+                (ast_score, self.ast_config),
+                (hash_score, self.hash_config),
+            )
+            if detector_config['weight'] > 0.0
+        )
 
         # Normalize weights to sum to 1.0
-        total_weight = sum(active_weights)
+        total_weight = sum(weight for _, weight in active)
         if total_weight == 0:
             logger.warning("No active detectors for confidence calculation")
             return 0.0
 
-        normalized_weights = [w / total_weight for w in active_weights]
-
         # Calculate weighted confidence
-        confidence = sum(score * weight for score, weight in zip(active_scores, normalized_weights))
+        confidence = sum(score * (weight / total_weight) for score, weight in active)
 
         # Clamp to [0.0, 1.0] (should already be in range, but ensure)
         confidence = min(1.0, max(0.0, confidence))
 
-        logger.debug(
-            f"Confidence: {confidence:.3f} "
-            f"(active_detectors={len(active_scores)}, "
-            f"weights={[f'{w:.2f}' for w in normalized_weights]})"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Confidence: %.3f (active_detectors=%d, weights=%s)",
+                confidence,
+                len(active),
+                [f'{w / total_weight:.2f}' for _, w in active],
+            )
 
         return confidence
 
@@ -139,6 +139,18 @@ class TestASTNormalization:
         # Original tree should be unchanged
         assert tree is not normalized
 
+    def test_normalize_in_place(self):
+        """Test in-place normalization matches normalizing a copy."""
+        detector = ASTDetector()
+        code = "@decorator\ndef myFunction(x: int) -> str:\n    return obj.attr + 'text' + 42"
+        copied = detector._normalize_ast(detector._parse_ast(code))
+
+        tree = detector._parse_ast(code)
+        normalized = detector._normalize_ast(tree, in_place=True)
+
+        assert normalized is tree
+        assert ast.dump(normalized) == ast.dump(copied)
+
     def test_normalize_function_names(self):
         """Test that normalization replaces function names."""
         detector = ASTDetector()
@@ -650,6 +662,92 @@ while left <= right:
         assert similarity < 0.9
 
 
+class TestLCSLength:
+    """Test the longest common subsequence helper."""
+
+    @staticmethod
+    def _naive_lcs(seq1, seq2):
+        """Reference LCS without prefix/suffix trimming."""
+        dp = [[0] * (len(seq2) + 1) for _ in range(len(seq1) + 1)]
+        for i in range(1, len(seq1) + 1):
+            for j in range(1, len(seq2) + 1):
+                if seq1[i - 1] == seq2[j - 1]:
+                    dp[i][j] = dp[i - 1][j - 1] + 1
+                else:
+                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+        return dp[-1][-1]
+
+    def test_identical_sequences(self):
+        """Test identical sequences return their full length."""
+        detector = ASTDetector()
+        seq = ["Module", "FunctionDef", "arguments", "Return", "Name"]
+        assert detector._lcs_length(seq, list(seq)) == len(seq)
+
+    def test_empty_sequences(self):
+        """Test empty sequences have an empty LCS."""
+        detector = ASTDetector()
+        assert detector._lcs_length([], []) == 0
+        assert detector._lcs_length(["Module"], []) == 0
+
+    @pytest.mark.parametrize(
+        "seq1,seq2",
+        [
+            ("ABCBDAB", "BDCABA"),
+            ("XABCY", "XACBY"),
+            ("AAAB", "AAB"),
+            ("ABAB", "ABABAB"),
+            ("ABC", "XYZ"),
+            ("PREFIXmiddleSUFFIX", "PREFIXotherSUFFIX"),
+        ],
+    )
+    def test_matches_reference(self, seq1, seq2):
+        """Test the LCS length matches the full DP table."""
+        detector = ASTDetector()
+        assert detector._lcs_length(list(seq1), list(seq2)) == self._naive_lcs(seq1, seq2)
+
+    def test_matches_reference_random(self):
+        """Test the bit-parallel LCS against the full DP on random sequences."""
+        import random
+
+        rng = random.Random(1234)
+        detector = ASTDetector()
+        alphabet = ["Name", "Call", "If", "Return", "Compare", "Constant"]
+        for _ in range(200):
+            seq1 = [rng.choice(alphabet) for _ in range(rng.randint(0, 80))]
+            seq2 = [rng.choice(alphabet) for _ in range(rng.randint(0, 80))]
+            assert detector._lcs_length(seq1, seq2) == self._naive_lcs(seq1, seq2)
+
+
+class TestPreparedComparison:
+    """Test prepare()/compare_prepared() against compare()."""
+
+    CODE1 = "def add(a, b):\n    return a + b\n"
+    CODE2 = "def total(x, y):\n    for i in range(x):\n        y += i\n    return y\n"
+
+    def test_prepare_returns_signature_and_counts(self):
+        """Test prepare() yields the normalized signature and node counts."""
+        detector = ASTDetector()
+        signature, counts = detector.prepare(self.CODE1)
+        normalized = detector._normalize_ast(detector._parse_ast(self.CODE1))
+        assert signature == detector._extract_structure_signature(normalized)
+        assert counts == detector._count_node_types(normalized)
+
+    def test_prepare_invalid_syntax_returns_none(self):
+        """Test prepare() returns None for unparseable code."""
+        detector = ASTDetector()
+        assert detector.prepare("def broken(:\n    pass") is None
+        assert detector.compare_prepared(None, detector.prepare(self.CODE1)) == 0.0
+
+    def test_compare_prepared_matches_compare(self):
+        """Test compare_prepared() on prepared sources equals compare()."""
+        detector = ASTDetector()
+        prepared1 = detector.prepare(self.CODE1)
+        prepared2 = detector.prepare(self.CODE2)
+        assert detector.compare_prepared(prepared1, prepared2) == detector.compare(
+            self.CODE1, self.CODE2
+        )
+
+
 @pytest.mark.parametrize(
     "threshold,expected_valid",
     [
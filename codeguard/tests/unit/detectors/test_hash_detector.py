@@ -521,5 +521,50 @@ class TestEdgeCases:
         assert similarity == 0.0
 
 
+class TestPreparedComparison:
+    """Test prepare()/compare_prepared() against compare()."""
+
+    CODE1 = """
+def process(data):
+    result = []
+    for item in data:
+        if item > 0:
+            result.append(item * 2)
+    return result
+"""
+    CODE2 = """
+def process(data):
+    result = []
+    for item in data:
+        if item < 0:
+            result.append(item + 1)
+    return sorted(result)
+"""
+
+    def test_prepare_returns_fingerprints(self):
+        """Test prepare() yields the winnowed fingerprint set."""
+        detector = HashDetector(k=5, w=4)
+        tokens = detector._tokenize(self.CODE1)
+        expected = detector._winnow(
+            detector._hash_kgrams(detector._generate_kgrams(tokens, 5)), 4
+        )
+        assert detector.prepare(self.CODE1) == expected
+
+    def test_compare_prepared_matches_compare(self):
+        """Test compare_prepared() on prepared sources equals compare()."""
+        detector = HashDetector()
+        prepared1 = detector.prepare(self.CODE1)
+        prepared2 = detector.prepare(self.CODE2)
+        assert detector.compare_prepared(prepared1, prepared2) == detector.compare(
+            self.CODE1, self.CODE2
+        )
+
+    def test_prepare_tokens_matches_prepare(self):
+        """Test prepare_tokens() on already extracted tokens equals prepare()."""
+        detector = HashDetector(k=5, w=4)
+        tokens = detector._tokenize(self.CODE1)
+        assert detector.prepare_tokens(tokens) == detector.prepare(self.CODE1)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
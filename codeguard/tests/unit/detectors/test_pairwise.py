@@ -0,0 +1,206 @@
+"""
+Unit tests for pairwise scoring of many sources (score_pairs).
+
+Tests cover:
+- Scores match the individual detectors
+- Pair order is preserved, in-process and on a process pool
+- A failing process pool falls back to in-process scoring
+- Interleaved calls do not share sources or prepared features
+- Disabled hash detector and per-detector errors
+- Each source is prepared once per detector
+- Identical sources share their preparation and scores
+"""
+
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "src"))
+from detectors import pairwise
+from detectors.pairwise import score_pairs
+from detectors.token_detector import TokenDetector
+from detectors.ast_detector import ASTDetector
+from detectors.hash_detector import HashDetector
+
+
+SOURCES = [
+    "def add(a, b):\n    return a + b\n",
+    "def total(x, y):\n    return x + y\n",
+    "for i in range(10):\n    if i % 2 == 0:\n        print(i)\n",
+    "class Stack:\n    def __init__(self):\n        self.items = []\n\n"
+    "    def push(self, item):\n        self.items.append(item)\n",
+]
+
+ALL_PAIRS = [(i, j) for i in range(len(SOURCES)) for j in range(i + 1, len(SOURCES))]
+
+
+def expected_scores(code1, code2, hash_active=True):
+    """Scores of one pair computed directly with fresh detectors."""
+    token_detector = TokenDetector()
+    tokens1 = token_detector._tokenize_code(code1)
+    tokens2 = token_detector._tokenize_code(code2)
+    return {
+        "token_jaccard": token_detector._calculate_jaccard_similarity(tokens1, tokens2),
+        "token_cosine": token_detector._calculate_cosine_similarity(tokens1, tokens2),
+        "ast": ASTDetector().compare(code1, code2),
+        "hash": HashDetector().compare(code1, code2) if hash_active else 0.0,
+        "errors": {},
+    }
+
+
+class TestScorePairs:
+    """Test score_pairs against the individual detectors."""
+
+    def test_matches_individual_detectors(self):
+        """Each result equals running the detectors on that pair."""
+        results = list(score_pairs(SOURCES, ALL_PAIRS, max_workers=1))
+
+        assert results == [expected_scores(SOURCES[i], SOURCES[j]) for i, j in ALL_PAIRS]
+
+    def test_hash_inactive_scores_zero(self):
+        """With the hash detector disabled its score is 0.0."""
+        results = list(score_pairs(SOURCES, ALL_PAIRS, hash_active=False, max_workers=1))
+
+        assert [r["hash"] for r in results] == [0.0] * len(ALL_PAIRS)
+        assert results == [
+            expected_scores(SOURCES[i], SOURCES[j], hash_active=False) for i, j in ALL_PAIRS
+        ]
+
+    def test_empty_pairs(self):
+        """No pairs yields no results."""
+        assert list(score_pairs(SOURCES, [], max_workers=1)) == []
+
+    def test_process_pool_preserves_order(self, monkeypatch):
+        """Results from worker processes come back in pair order."""
+        monkeypatch.setattr(pairwise, "PARALLEL_MIN_PAIRS", 2)
+        pairs = ALL_PAIRS * 3
+
+        parallel = list(score_pairs(SOURCES, pairs, max_workers=2))
+
+        assert parallel == list(score_pairs(SOURCES, pairs, max_workers=1))
+
+    def test_broken_pool_scores_remaining_pairs_in_process(self, monkeypatch):
+        """Pairs a broken process pool did not return are scored in-process."""
+
+        class BrokenPool:
+            """Stands in for a pool whose worker dies after two pairs."""
+
+            def __init__(self, max_workers, initializer, initargs):
+                initializer(*initargs)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def map(self, fn, items, chunksize=1):
+                items = list(items)
+                yield fn(items[0])
+                yield fn(items[1])
+                raise BrokenProcessPool("worker died")
+
+        monkeypatch.setattr(pairwise, "PARALLEL_MIN_PAIRS", 2)
+        monkeypatch.setattr(pairwise, "ProcessPoolExecutor", BrokenPool)
+
+        results = list(score_pairs(SOURCES, ALL_PAIRS, max_workers=2))
+
+        assert results == [expected_scores(SOURCES[i], SOURCES[j]) for i, j in ALL_PAIRS]
+
+    def test_interleaved_calls_keep_their_own_sources(self):
+        """Two score_pairs generators advanced in turn each score their own files."""
+        other_sources = list(reversed(SOURCES))
+        first = score_pairs(SOURCES, ALL_PAIRS, max_workers=1)
+        second = score_pairs(other_sources, ALL_PAIRS, max_workers=1)
+
+        first_results, second_results = [], []
+        for _ in ALL_PAIRS:
+            first_results.append(next(first))
+            second_results.append(next(second))
+
+        assert first_results == [expected_scores(SOURCES[i], SOURCES[j]) for i, j in ALL_PAIRS]
+        assert second_results == [
+            expected_scores(other_sources[i], other_sources[j]) for i, j in ALL_PAIRS
+        ]
+
+    def test_same_index_prepared_per_call(self, monkeypatch):
+        """Each call prepares its own sources, even at the same indices."""
+        prepared = []
+        original = ASTDetector.prepare
+
+        def counting_prepare(self, source):
+            prepared.append(source)
+            return original(self, source)
+
+        monkeypatch.setattr(ASTDetector, "prepare", counting_prepare)
+        other_sources = [SOURCES[2], SOURCES[3]]
+
+        (first,) = score_pairs(SOURCES[:2], [(0, 1)], max_workers=1)
+        (second,) = score_pairs(other_sources, [(0, 1)], max_workers=1)
+
+        assert prepared == SOURCES[:2] + other_sources
+        assert second == expected_scores(*other_sources)
+
+    def test_detector_error_is_reported(self, monkeypatch):
+        """A failing detector scores 0.0 and reports its error message."""
+
+        def fail(self, features1, features2):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(ASTDetector, "compare_prepared", fail)
+
+        (result,) = score_pairs(SOURCES, [(0, 1)], max_workers=1)
+
+        assert result["ast"] == 0.0
+        assert result["errors"] == {"ast": "boom"}
+        assert result["token_jaccard"] > 0.0
+
+    def test_each_source_prepared_once(self, monkeypatch):
+        """Features are computed once per source and detector, not once per pair."""
+        prepared = []
+        original = TokenDetector.prepare
+
+        def counting_prepare(self, source):
+            prepared.append(source)
+            return original(self, source)
+
+        monkeypatch.setattr(TokenDetector, "prepare", counting_prepare)
+
+        list(score_pairs(SOURCES, ALL_PAIRS, max_workers=1))
+
+        assert sorted(prepared) == sorted(SOURCES)
+
+    def test_empty_sources_match_detector(self):
+        """Empty sources score like the detectors' empty-input edge cases."""
+        sources = ["", "", SOURCES[0]]
+        pairs = [(0, 1), (0, 2), (2, 1)]
+
+        results = list(score_pairs(sources, pairs, max_workers=1))
+
+        assert results == [expected_scores(sources[i], sources[j]) for i, j in pairs]
+
+    def test_duplicate_sources_match_detectors(self):
+        """Pairs involving identical sources score like any other pair."""
+        sources = SOURCES + [SOURCES[0], SOURCES[2]]
+        pairs = [(i, j) for i in range(len(sources)) for j in range(i + 1, len(sources))]
+
+        results = list(score_pairs(sources, pairs, max_workers=1))
+
+        assert results == [expected_scores(sources[i], sources[j]) for i, j in pairs]
+
+    def test_duplicate_sources_prepared_once(self, monkeypatch):
+        """Identical sources are prepared once, not once per copy."""
+        prepared = []
+        original = ASTDetector.prepare
+
+        def counting_prepare(self, source):
+            prepared.append(source)
+            return original(self, source)
+
+        monkeypatch.setattr(ASTDetector, "prepare", counting_prepare)
+
+        list(score_pairs(SOURCES + SOURCES, [(0, 5), (1, 4), (4, 5)], max_workers=1))
+
+        assert sorted(prepared) == sorted(SOURCES[:2])
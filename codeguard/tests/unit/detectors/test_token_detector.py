@@ -552,6 +552,43 @@ class TestThresholdBehavior:
             assert result["is_plagiarism"] is True
 
 
+class TestPreparedComparison:
+    """Test prepare()/compare_prepared() against compare()."""
+
+    CODE1 = "def add(a, b):\n    return a + b\n"
+    CODE2 = "def total(x, y):\n    result = x + y\n    return result\n"
+
+    def test_prepare_returns_tokens(self):
+        """Test prepare() yields the same tokens as _tokenize_code()."""
+        detector = TokenDetector()
+        assert detector.prepare(self.CODE1) == detector._tokenize_code(self.CODE1)
+
+    def test_compare_prepared_matches_compare(self):
+        """Test compare_prepared() on prepared sources equals compare()."""
+        detector = TokenDetector()
+        prepared1 = detector.prepare(self.CODE1)
+        prepared2 = detector.prepare(self.CODE2)
+        assert detector.compare_prepared(prepared1, prepared2) == detector.compare(
+            self.CODE1, self.CODE2
+        )
+
+    def test_prepared_features_reusable(self):
+        """Test prepared features can be reused across comparisons."""
+        detector = TokenDetector()
+        prepared1 = detector.prepare(self.CODE1)
+        assert detector.compare_prepared(prepared1, prepared1) == pytest.approx(1.0)
+        assert detector.compare_prepared(prepared1, detector.prepare(self.CODE2)) < 1.0
+
+    def test_prepare_tokens_matches_prepare(self):
+        """Test prepare_tokens() on HashDetector's tokens equals prepare()."""
+        from detectors.hash_detector import HashDetector
+
+        detector = TokenDetector()
+        code = "def Add(A, b):\n    return A + B\n"
+        tokens = HashDetector()._tokenize(code)
+        assert detector.prepare_tokens(tokens) == detector.prepare(code)
+
+
 @pytest.mark.parametrize(
     "threshold,expected_valid",
     [